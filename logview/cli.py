@@ -7,15 +7,7 @@
 import argparse
 import sys
 import os
-import curses
-from .core.parser import LogParser
-from .core.viewer import LogViewer
-from .ui.curses_ui import CursesUI
-from .plugins.quantum_chem import QuantumChemPlugin
-from .utils.config import (
-    load_separators, save_separators, DEFAULT_SEPARATORS,
-    load_keyword_types, save_keyword_types, DEFAULT_KEYWORD_TYPES
-)
+from .utils.config import load_separators, DEFAULT_SEPARATORS
 
 
 def parse_args():
@@ -92,26 +84,22 @@ def main():
         print("LogView v1.0.0")
         return
     
-    # 确保配置文件存在
-    separators = load_separators()
-    if separators == DEFAULT_SEPARATORS:
-        save_separators(DEFAULT_SEPARATORS)
-    
-    keyword_types = load_keyword_types()
-    if keyword_types == DEFAULT_KEYWORD_TYPES:
-        save_keyword_types(DEFAULT_KEYWORD_TYPES)
-    
     # 检查是否提供了文件名
     if not args.filename:
         print("错误: 未指定文件名")
         print("使用 'logview -h' 查看帮助")
         return
     
-    # 检查文件是否存在
-    if not os.path.exists(args.filename):
+    # 检查文件是否存在，状态信息留给后续的文件类型检测复用
+    try:
+        file_stat = os.stat(args.filename)
+    except OSError:
         print(f"错误: 文件 '{args.filename}' 不存在")
         return
     
+    # 配置文件不存在时由加载函数创建默认配置，已存在则只读取不重写
+    separators = load_separators()
+    
     # 确定使用的分隔符
     separator_type = "grad"  # 默认值
     if args.separator:
@@ -121,13 +109,20 @@ def main():
     elif args.irc:
         separator_type = "irc"
     
-    # 创建量子化学插件，并检测文件类型
-    quantum_plugin = QuantumChemPlugin("quantum_chem", "量子化学程序输出文件支持")
+    # 界面、查看器和插件模块较重，只在确实要打开文件时才导入
+    import curses
+    from .core.viewer import LogViewer
+    from .ui.curses_ui import CursesUI
+    from .plugins.base import PluginManager
+    from .plugins.quantum_chem import QuantumChemPlugin
+    
+    # 注册量子化学插件，注册时创建的实例同时用于文件类型检测和后续加载
+    plugin_manager = PluginManager()
+    quantum_plugin = plugin_manager.register_plugin_class(QuantumChemPlugin)
     
-    # 检测是否为量子化学文件，并建议分隔符
-    if quantum_plugin.detect_file_type(args.filename):
-        suggested_separator = quantum_plugin.suggest_separator(args.filename)
-        
+    # 检测是否为量子化学文件，并建议分隔符（只读取一次文件头）
+    detected, suggested_separator = quantum_plugin.analyze(args.filename, file_stat)
+    if detected:
         # 如果没有通过参数指定分隔符，则使用建议的分隔符
         if not (args.separator or args.grad or args.irc):
             separator = suggested_separator
@@ -141,8 +136,11 @@ def main():
     # 修正：直接初始化LogViewer，传入文件路径和分隔符
     viewer = LogViewer(args.filename, separator)
     
-    # 初始化量子化学插件
-    quantum_plugin.initialize(viewer)
+    # 初始化量子化学插件，失败时在状态栏报告错误，不带插件继续运行
+    if plugin_manager.load_plugin(quantum_plugin.name, viewer) is None:
+        error = plugin_manager.failed_plugins.get(quantum_plugin.name)
+        viewer.state.message = f"插件 {quantum_plugin.name} 初始化失败: {error}"
+        viewer.state.error = True
     
     # 启动用户界面
     ui = CursesUI(viewer)
@@ -5,12 +5,13 @@
 """
 
 from typing import Dict, List, Callable, Any, Optional
-from abc import ABC, abstractmethod
 
 
-class Command(ABC):
+class Command:
     """命令基类，所有命令都应继承此类"""
     
+    __slots__ = ('name', 'description', 'handler')
+    
     def __init__(self, name: str, description: str, handler: Callable):
         """
         初始化命令
@@ -24,7 +25,6 @@ class Command(ABC):
         self.description = description
         self.handler = handler
     
-    @abstractmethod
     def execute(self, *args, **kwargs) -> Any:
         """
         执行命令
@@ -34,7 +34,7 @@ class Command(ABC):
         Returns:
             Any: 命令执行结果
         """
-        pass
+        raise NotImplementedError(f"命令 '{self.name}' 未实现 execute 方法")
 
 
 class CommandManager:
@@ -44,6 +44,8 @@ class CommandManager:
         """初始化命令管理器"""
         self.commands: Dict[str, Command] = {}
         self.aliases: Dict[str, str] = {}
+        # 命令名和别名到命令对象的合并映射，查找时只需一次字典访问
+        self._resolved: Dict[str, Command] = {}
     
     def register_command(self, command: Command) -> None:
         """
@@ -53,6 +55,12 @@ class CommandManager:
             command: 要注册的命令对象
         """
         self.commands[command.name] = command
+        self._resolved[command.name] = command
+        
+        # 更新指向该命令的别名
+        for alias, command_name in self.aliases.items():
+            if command_name == command.name and alias not in self.commands:
+                self._resolved[alias] = command
     
     def register_alias(self, alias: str, command_name: str) -> bool:
         """
@@ -67,6 +75,9 @@ class CommandManager:
         """
         if command_name in self.commands:
             self.aliases[alias] = command_name
+            # 命令名优先于同名别名
+            if alias not in self.commands:
+                self._resolved[alias] = self.commands[command_name]
             return True
         return False
     
@@ -80,13 +91,7 @@ class CommandManager:
         Returns:
             Optional[Command]: 命令对象，如果未找到则返回None
         """
-        if name in self.commands:
-            return self.commands[name]
-        
-        if name in self.aliases:
-            return self.commands[self.aliases[name]]
-        
-        return None
+        return self._resolved.get(name)
     
     def execute_command(self, name: str, *args, **kwargs) -> Any:
         """
@@ -103,7 +108,7 @@ class CommandManager:
         Raises:
             ValueError: 如果命令未找到
         """
-        command = self.get_command(name)
+        command = self._resolved.get(name)
         if command:
             return command.execute(*args, **kwargs)
         
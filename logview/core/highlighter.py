@@ -29,17 +29,72 @@ class HighlightPattern:
         self.is_regex = is_regex
         self.case_sensitive = case_sensitive
         
-        # 预编译正则表达式
-        if is_regex:
-            flags = 0 if case_sensitive else re.IGNORECASE
+        # 正则表达式在首次使用时才编译
+        self._regex: Optional[re.Pattern] = None
+        self._compiled = not is_regex
+    
+    @property
+    def regex(self) -> Optional[re.Pattern]:
+        """编译后的正则表达式，普通文本模式或正则无效时为None"""
+        if not self._compiled:
+            self._compiled = True
+            flags = 0 if self.case_sensitive else re.IGNORECASE
             try:
-                self.regex = re.compile(pattern, flags)
+                self._regex = re.compile(self.pattern, flags)
             except re.error:
                 # 如果正则表达式无效，退回到普通文本匹配
                 self.is_regex = False
-                self.regex = None
-        else:
-            self.regex = None
+        return self._regex
+
+
+def merge_keyword_styles(*groups: Tuple[str, List[str]]) -> Dict[str, str]:
+    """
+    按优先级合并关键词分组
+
+    Args:
+        *groups: (样式名, 关键词列表) 序列，排在前面的优先级更高
+
+    Returns:
+        Dict[str, str]: 关键词到样式名的映射，重复的关键词只保留优先级最高的样式
+    """
+    styles: Dict[str, str] = {}
+    for style_name, keywords in groups:
+        for keyword in keywords:
+            styles.setdefault(keyword, style_name)
+    return styles
+
+
+def literal_trie_pattern(words: List[str]) -> str:
+    """
+    把一组普通文本关键词生成为按前缀树展开的正则表达式
+
+    共同前缀只写一次，例如 ["scan", "scf"] 生成 "sc(?:an|f)"，
+    正则引擎在每个位置只需沿一条分支比较，而不必逐个尝试每个关键词。
+
+    Args:
+        words: 关键词列表
+
+    Returns:
+        str: 在任一关键词出现的位置都能匹配的正则表达式文本
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        # 空字符串键标记一个关键词在此结束
+        node[""] = {}
+
+    def generate(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + generate(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # 已有关键词在此结束时后续部分可以不匹配
+        return "(?:" + body + ")?" if "" in node else body
+
+    return generate(trie)
 
 
 class Highlighter:
@@ -62,52 +117,54 @@ class Highlighter:
         "dipole moments", "Point Number:"
     ]
     
+    # 默认关键词及其样式，按 错误 > 警告 > 成功 > 普通关键词 的优先级去重
+    DEFAULT_KEYWORD_STYLES = merge_keyword_styles(
+        ("error", ["Error", "Failed", "错误", "失败"]),
+        ("warning", ["Warning", "警告"]),
+        ("success", ["SCF Done", "Optimization completed", "Converged"]),
+        ("keyword", COMMON_KEYWORDS),
+    )
+    
     def __init__(self):
         """初始化高亮器"""
         self.patterns: List[HighlightPattern] = []
         self.search_pattern: Optional[HighlightPattern] = None
         self.enabled = True
         
+        # 所有模式合并成的单个正则，模式列表变化时重新生成
+        self._combined_regex: Optional[re.Pattern] = None
+        self._group_patterns: Dict[str, HighlightPattern] = {}
+        # 无法合并的正则模式，仍逐个匹配
+        self._separate_patterns: List[HighlightPattern] = []
+        # 全部为普通文本模式时使用前缀树正则：小写关键词 -> [(注册顺序, 模式)]，以及关键词的不同长度
+        self._literal_patterns: Dict[str, List[Tuple[int, HighlightPattern]]] = {}
+        self._literal_lengths: List[int] = []
+        
         # 初始化默认高亮模式
         self._setup_default_patterns()
     
     def _setup_default_patterns(self):
         """设置默认的高亮模式"""
-        # 错误关键词
-        for keyword in ["Error", "Failed", "错误", "失败"]:
-            self.add_pattern(
-                keyword, 
-                self.DEFAULT_STYLES["error"],
-                whole_line=True,
-                case_sensitive=False
-            )
-        
-        # 警告关键词
-        for keyword in ["Warning", "警告"]:
-            self.add_pattern(
-                keyword, 
-                self.DEFAULT_STYLES["warning"],
-                whole_line=True,
-                case_sensitive=False
-            )
-        
-        # 成功关键词
-        for keyword in ["SCF Done", "Optimization completed", "Converged"]:
-            self.add_pattern(
-                keyword, 
-                self.DEFAULT_STYLES["success"],
-                whole_line=True,
-                case_sensitive=False
-            )
+        self.set_keyword_patterns(self.DEFAULT_KEYWORD_STYLES)
+    
+    def set_keyword_patterns(self, keyword_styles: Dict[str, str]) -> None:
+        """
+        用一组关键词替换所有高亮模式
         
-        # 常见的量子化学关键词
-        for keyword in self.COMMON_KEYWORDS:
-            self.add_pattern(
-                keyword, 
-                self.DEFAULT_STYLES["keyword"],
-                whole_line=False,
+        Args:
+            keyword_styles: 关键词到样式名的映射，可由 merge_keyword_styles 按优先级去重生成
+        """
+        # 普通关键词只高亮关键词本身，其他类型高亮整行
+        self.patterns = [
+            HighlightPattern(
+                keyword,
+                self.DEFAULT_STYLES[style_name],
+                whole_line=(style_name != "keyword"),
                 case_sensitive=False
             )
+            for keyword, style_name in keyword_styles.items()
+        ]
+        self._combined_regex = None
     
     def add_pattern(self, pattern: str, style: Dict[str, Any], whole_line: bool = False, 
                    is_regex: bool = False, case_sensitive: bool = False) -> None:
@@ -124,23 +181,27 @@ class Highlighter:
         self.patterns.append(
             HighlightPattern(pattern, style, whole_line, is_regex, case_sensitive)
         )
+        self._combined_regex = None
     
     def clear_patterns(self):
         """清除所有高亮模式"""
         self.patterns = []
+        self._combined_regex = None
     
     def reset_to_defaults(self):
         """重置为默认高亮模式"""
         self.clear_patterns()
         self._setup_default_patterns()
     
-    def set_search_pattern(self, pattern: str, case_sensitive: bool = False):
+    def set_search_pattern(self, pattern: str, case_sensitive: bool = False,
+                           regex: Optional[re.Pattern] = None):
         """
         设置当前的搜索高亮模式
         
         Args:
             pattern: 搜索关键词
             case_sensitive: 是否区分大小写
+            regex: 调用方已编译好的匹配该关键词的正则，提供时直接使用而不再按文本查找
         """
         if not pattern:
             self.search_pattern = None
@@ -153,6 +214,10 @@ class Highlighter:
             is_regex=False,
             case_sensitive=case_sensitive
         )
+        if regex is not None:
+            self.search_pattern.is_regex = True
+            self.search_pattern._regex = regex
+            self.search_pattern._compiled = True
     
     def find_matches(self, text: str, pattern: HighlightPattern) -> List[Tuple[int, int]]:
         """
@@ -186,4 +251,121 @@ class Highlighter:
                 matches.append((start, start + len(search_text)))
                 start += 1
                 
-        return matches 
\ No newline at end of file
+        return matches
+    
+    def _build_combined_regex(self) -> None:
+        """将所有高亮模式合并为一个带命名分组的正则表达式"""
+        parts = []
+        self._group_patterns = {}
+        self._separate_patterns = []
+        self._literal_patterns = {}
+        self._literal_lengths = []
+        
+        # 关键词全部是普通文本时（默认和插件设置的关键词都是如此），生成一个前缀树正则，
+        # 匹配后再按文本查出对应的模式
+        literals = [(i, pattern) for i, pattern in enumerate(self.patterns) if pattern.pattern]
+        if literals and not any(pattern.is_regex for _, pattern in literals):
+            for i, pattern in literals:
+                self._literal_patterns.setdefault(pattern.pattern.lower(), []).append((i, pattern))
+            self._literal_lengths = sorted({len(key) for key in self._literal_patterns})
+            self._combined_regex = re.compile(
+                "(?i:" + literal_trie_pattern(list(self._literal_patterns)) + ")")
+            return
+        
+        for i, pattern in enumerate(self.patterns):
+            if not pattern.pattern:
+                continue
+            name = f"p{i}"
+            text = pattern.pattern if pattern.is_regex and pattern.regex else re.escape(pattern.pattern)
+            if not pattern.case_sensitive:
+                text = f"(?i:{text})"
+            part = f"(?P<{name}>{text})"
+            
+            if pattern.is_regex and pattern.regex:
+                # 含全局标志或分组名冲突的正则无法嵌入，单独匹配
+                try:
+                    re.compile(part)
+                except re.error:
+                    self._separate_patterns.append(pattern)
+                    continue
+            
+            parts.append(part)
+            self._group_patterns[name] = pattern
+        
+        # 没有可合并的模式时使用一个永不匹配的表达式
+        try:
+            self._combined_regex = re.compile("|".join(parts) if parts else r"(?!x)x")
+        except re.error:
+            self._combined_regex = re.compile(r"(?!x)x")
+            self._group_patterns = {}
+            self._separate_patterns = [p for p in self.patterns if p.pattern]
+    
+    def find_all_matches(self, text: str) -> List[Tuple[int, int, HighlightPattern]]:
+        """
+        一次扫描查找文本中所有高亮模式的匹配位置
+        
+        所有模式合并为一个正则后只扫描一遍文本，匹配结果由命中的分组名映射回模式，
+        同一位置按注册顺序优先。
+        
+        Args:
+            text: 要检查的文本
+            
+        Returns:
+            List[Tuple[int, int, HighlightPattern]]: 按起始位置排序的 (起始, 结束, 模式) 列表
+        """
+        if self._combined_regex is None:
+            self._build_combined_regex()
+        
+        if self._literal_patterns:
+            return self._find_literal_matches(text)
+        
+        matches = [(m.start(), m.end(), self._group_patterns[m.lastgroup])
+                   for m in self._combined_regex.finditer(text)]
+        
+        if self._separate_patterns:
+            for pattern in self._separate_patterns:
+                matches.extend((start, end, pattern)
+                               for start, end in self.find_matches(text, pattern))
+            matches.sort(key=lambda match: match[0])
+        return matches
+    
+    def _find_literal_matches(self, text: str) -> List[Tuple[int, int, HighlightPattern]]:
+        """
+        用前缀树正则查找普通文本模式的匹配位置
+        
+        前缀树正则只负责找到有关键词出现的位置，该位置上实际生效的模式按注册顺序确定，
+        与合并正则的结果一致。
+        
+        Args:
+            text: 要检查的文本
+            
+        Returns:
+            List[Tuple[int, int, HighlightPattern]]: 按起始位置排序的 (起始, 结束, 模式) 列表
+        """
+        matches = []
+        search = self._combined_regex.search
+        literal_patterns = self._literal_patterns
+        text_len = len(text)
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            best: Optional[Tuple[int, int, HighlightPattern]] = None
+            for length in self._literal_lengths:
+                end = start + length
+                if end > text_len:
+                    break
+                segment = text[start:end]
+                for i, pattern in literal_patterns.get(segment.lower(), ()):
+                    if (best is None or i < best[0]) and (
+                            not pattern.case_sensitive or segment == pattern.pattern):
+                        best = (i, end, pattern)
+            if best is None:
+                # 只是忽略大小写时相同，区分大小写的模式并未匹配
+                pos = start + 1
+                continue
+            matches.append((start, best[1], best[2]))
+            pos = best[1]
+        return matches
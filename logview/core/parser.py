@@ -6,13 +6,95 @@
 
 import re
 import os
-from typing import List, Dict, Optional, Tuple
+import mmap
+import bisect
+import collections
+import collections.abc
+import concurrent.futures
+from typing import List, Dict, Optional, Tuple, Sequence, Iterator
 from ..utils.config import load_separators, DEFAULT_SEPARATORS
+from ..utils.cache import load_block_index, save_block_index
+from ..utils.pool import get_process_pool
+
+
+def needs_unicode_fold(keyword: str) -> bool:
+    """
+    检查关键词是否包含区分大小写的非ASCII字符
+
+    字节形式的小写转换只作用于ASCII字母，这类关键词需要按Unicode规则匹配。
+
+    Args:
+        keyword: 搜索关键词
+
+    Returns:
+        bool: 是否需要Unicode大小写折叠
+    """
+    return any(ord(c) > 127 and c.lower() != c.upper() for c in keyword)
+
+
+def _scan_blocks_range(filename: str, block_offsets: List[Tuple[int, int]],
+                       needle: bytes) -> List[int]:
+    """
+    在子进程中扫描一段连续的块，返回包含关键词的块在该段中的序号
+
+    子进程自行映射文件并只转换所负责字节范围的大小写，不需要传输块内容。
+
+    Args:
+        filename: 日志文件路径
+        block_offsets: 该段块的 (起始, 结束) 字节偏移
+        needle: 小写字节形式的关键词
+
+    Returns:
+        List[int]: 命中块在该段中的序号列表
+    """
+    with open(filename, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return [i for i, (start, end) in enumerate(block_offsets)
+                if mm[start:end].lower().find(needle) != -1]
+    finally:
+        mm.close()
+
+
+class LazyBlocks(collections.abc.Sequence):
+    """块序列视图，按需从映射文件中解码块内容，不预先保存所有块的文本"""
+    
+    def __init__(self, parser: "LogParser"):
+        """
+        初始化块序列视图
+        
+        Args:
+            parser: 提供块偏移表的解析器
+        """
+        self._parser = parser
+    
+    def __len__(self) -> int:
+        return len(self._parser.block_offsets)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._parser.get_block(i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        block = self._parser.get_block(index)
+        if block is None:
+            raise IndexError("块索引超出范围")
+        return block
 
 
 class LogParser:
     """日志文件解析器，支持基于分隔符的分块功能"""
     
+    # 缓存行偏移的块数量上限
+    LINE_STARTS_CACHE_SIZE = 16
+    
+    # 扫描整个文件时每次转换为小写的字节数，不在内存中保留整个文件的小写副本
+    LOWER_WINDOW_SIZE = 16 * 1024 * 1024
+    
+    # 达到该文件大小和块数才使用多进程过滤
+    PARALLEL_SEARCH_MIN_SIZE = 64 * 1024 * 1024
+    PARALLEL_SEARCH_MIN_BLOCKS = 32
+    
     def __init__(self, filename: Optional[str] = None, separator: Optional[str] = None):
         """
         初始化解析器
@@ -22,8 +104,22 @@ class LogParser:
             separator: 块分隔符，默认使用Grad分隔符
         """
         self.filename = filename
-        self.content = ""
-        self.blocks: List[str] = []
+        # 文件的只读内存映射，空文件或未加载时为None
+        self._mm: Optional[mmap.mmap] = None
+        # 加载时文件的 (修改时间, 大小)，用于块索引缓存校验
+        self._stat: Optional[Tuple[int, int]] = None
+        # 每个块在文件中的字节范围 (起始, 结束)
+        self.block_offsets: List[Tuple[int, int]] = []
+        self._block_starts: List[int] = []
+        self.blocks = LazyBlocks(self)
+        # 最近一次解码的块 (索引, 内容)
+        self._block_cache: Tuple[int, Optional[str]] = (-1, None)
+        # 块内各行起始偏移的LRU缓存
+        self._line_starts_cache: "collections.OrderedDict[int, List[int]]" = collections.OrderedDict()
+        # 关键词（小写字节形式）到块出现表的映射，第i个字节为1表示第i块包含该关键词
+        self._presence: Dict[bytes, bytearray] = {}
+        # 需要一次性批量建立出现表的预设关键词
+        self._indexed_keywords: List[bytes] = []
         
         # 加载分隔符配置
         self.separators = load_separators()
@@ -34,6 +130,17 @@ class LogParser:
         else:
             self.separator = self.separators.get("grad", DEFAULT_SEPARATORS["grad"])
     
+    @property
+    def separator(self) -> str:
+        """当前使用的块分隔符"""
+        return self._separator
+    
+    @separator.setter
+    def separator(self, value: str) -> None:
+        # 分隔符变化时才重新编码，解析时直接使用字节形式
+        self._separator = value
+        self._separator_bytes = value.encode('utf-8')
+    
     def set_separator(self, separator_type: str = "grad", custom_separator: Optional[str] = None) -> None:
         """
         设置分隔符
@@ -63,42 +170,87 @@ class LogParser:
         if filename:
             self.filename = filename
             
-        if not self.filename or not os.path.exists(self.filename):
+        if not self.filename:
             return False
-            
+        
+        # 直接打开文件，用同一个文件描述符完成存在性检查、状态查询和映射
         try:
-            with open(self.filename, 'r', encoding='utf-8', errors='ignore') as file:
-                self.content = file.read()
-            return True
-        except Exception:
+            with open(self.filename, 'rb') as file:
+                st = os.fstat(file.fileno())
+                size = st.st_size
+                # 空文件无法映射，视为没有内容
+                mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except (OSError, ValueError):
             return False
+        
+        self.close()
+        self._mm = mm
+        self._stat = (st.st_mtime_ns, size)
+        return True
+    
+    def close(self) -> None:
+        """释放文件映射和块索引"""
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # 仍有块视图引用该映射，交由垃圾回收在视图释放后关闭
+                pass
+            self._mm = None
+        self._stat = None
+        self.block_offsets = []
+        self._block_starts = []
+        self._block_cache = (-1, None)
+        self._line_starts_cache.clear()
+        self._presence.clear()
     
-    def parse(self) -> List[str]:
+    def has_content(self) -> bool:
+        """
+        检查是否已加载非空文件
+        
+        Returns:
+            bool: 是否有可解析的内容
+        """
+        return self._mm is not None
+    
+    def parse(self) -> Sequence[str]:
         """
         根据分隔符解析文件内容为块
         
+        只记录每个块的字节范围，块内容在访问时才解码。
+        
         Returns:
-            List[str]: 分块后的内容列表
+            Sequence[str]: 分块后的内容序列
         """
-        if not self.content:
-            return []
-            
-        # 使用正则表达式分割文件
-        pattern = re.escape(self.separator)
-        parts = re.split(f"({pattern})", self.content)
-        
-        # 将分隔符与内容合并（除了第一块可能没有前导分隔符）
-        self.blocks = []
-        for i in range(0, len(parts), 2):
-            # 如果还有下一个分隔符，则将其添加到当前块
-            if i+1 < len(parts):
-                self.blocks.append(parts[i] + parts[i+1])
-            else:
-                self.blocks.append(parts[i])
+        self.block_offsets = []
+        self._block_starts = []
+        self._block_cache = (-1, None)
+        self._line_starts_cache.clear()
+        self._presence.clear()
+        
+        if self._mm is None:
+            return self.blocks
         
-        # 如果文件不包含分隔符，则将整个文件作为一个块
-        if not self.blocks:
-            self.blocks = [self.content]
+        # 文件和分隔符均未变化时直接使用磁盘上的块索引
+        mtime_ns, size = self._stat
+        cached = load_block_index(self.filename, mtime_ns, size, self.separator)
+        if cached is not None:
+            self.block_offsets = cached
+        else:
+            # 分隔符附加在所在块的末尾，最后一个分隔符之后的内容单独成块，
+            # 分隔符是普通字符串，直接用查找代替正则匹配
+            start = 0
+            sep = self._separator_bytes
+            if sep:
+                pos = self._mm.find(sep)
+                while pos != -1:
+                    end = pos + len(sep)
+                    self.block_offsets.append((start, end))
+                    start = end
+                    pos = self._mm.find(sep, start)
+            self.block_offsets.append((start, len(self._mm)))
+            save_block_index(self.filename, mtime_ns, size, self.separator, self.block_offsets)
+        self._block_starts = [offset[0] for offset in self.block_offsets]
             
         return self.blocks
         
@@ -112,25 +264,229 @@ class LogParser:
         Returns:
             Optional[str]: 指定索引的块内容，如果索引无效则返回None
         """
-        if 0 <= index < len(self.blocks):
-            return self.blocks[index]
-        return None
+        if not 0 <= index < len(self.block_offsets):
+            return None
+        
+        if self._block_cache[0] == index:
+            return self._block_cache[1]
+        
+        start, end = self.block_offsets[index]
+        block = self._mm[start:end].decode('utf-8', errors='ignore')
+        self._block_cache = (index, block)
+        return block
+    
+    def get_block_view(self, index: int) -> Optional[memoryview]:
+        """
+        获取指定索引的块在映射文件中的原始字节视图，不复制也不解码
+        
+        Args:
+            index: 块索引
+            
+        Returns:
+            Optional[memoryview]: 块的字节视图，如果索引无效则返回None
+        """
+        if not 0 <= index < len(self.block_offsets):
+            return None
+        
+        start, end = self.block_offsets[index]
+        return memoryview(self._mm)[start:end]
+    
+    def _lower_windows(self, overlap: int) -> Iterator[Tuple[int, bytes]]:
+        """
+        分段生成小写形式的文件内容，每段用完即可释放
+        
+        相邻两段重叠 overlap 字节，长度不超过 overlap+1 的关键词总能完整出现在某一段中。
+        
+        Args:
+            overlap: 相邻两段重叠的字节数
+            
+        Yields:
+            Tuple[int, bytes]: (该段在文件中的起始位置, 小写的该段内容，仅转换ASCII字母)
+        """
+        size = len(self._mm)
+        step = max(self.LOWER_WINDOW_SIZE, overlap + 1)
+        base = 0
+        while base < size:
+            yield base, self._mm[base:base + step + overlap].lower()
+            base += step
+    
+    def get_line_starts(self, index: int) -> List[int]:
+        """
+        获取块内每一行的起始偏移
+        
+        Args:
+            index: 块索引
+            
+        Returns:
+            List[int]: 每行相对块起点的字节偏移
+        """
+        line_starts = self._line_starts_cache.get(index)
+        if line_starts is not None:
+            self._line_starts_cache.move_to_end(index)
+            return line_starts
+        
+        start, end = self.block_offsets[index]
+        line_starts = [0]
+        pos = self._mm.find(b'\n', start, end)
+        while pos != -1:
+            line_starts.append(pos + 1 - start)
+            pos = self._mm.find(b'\n', pos + 1, end)
+        
+        self._line_starts_cache[index] = line_starts
+        if len(self._line_starts_cache) > self.LINE_STARTS_CACHE_SIZE:
+            self._line_starts_cache.popitem(last=False)
+        return line_starts
+    
+    def get_line_count(self, index: int) -> int:
+        """
+        获取块的行数
+        
+        已缓存行起始位置时直接取其长度，否则只统计换行符数量，不分行也不建立偏移表。
+        
+        Args:
+            index: 块索引
+            
+        Returns:
+            int: 块的行数
+        """
+        line_starts = self._line_starts_cache.get(index)
+        if line_starts is not None:
+            return len(line_starts)
+        return self.get_block(index).count('\n') + 1
+    
+    def add_indexed_keywords(self, keywords: List[str]) -> None:
+        """
+        登记预设关键词，首次过滤时一次扫描为它们全部建立块出现表
+        
+        Args:
+            keywords: 关键词列表
+        """
+        for keyword in keywords:
+            needle = keyword.encode('utf-8').lower()
+            if needle and not needs_unicode_fold(keyword) and needle not in self._indexed_keywords:
+                self._indexed_keywords.append(needle)
+    
+    def _build_keyword_presence(self) -> None:
+        """一次扫描为所有尚未建立出现表的预设关键词建立块出现表"""
+        needles = [n for n in self._indexed_keywords if n not in self._presence]
+        if not needles:
+            return
+        
+        # 长关键词优先匹配，同一位置命中时较短的前缀关键词一并记录
+        needles.sort(key=len, reverse=True)
+        prefixes = {n: [m for m in needles if n.startswith(m)] for n in needles}
+        presence = {n: bytearray(len(self.block_offsets)) for n in needles}
+        
+        pattern = re.compile(b"(?=(" + b"|".join(re.escape(n) for n in needles) + b"))")
+        for base, lower in self._lower_windows(len(needles[0]) - 1):
+            for match in pattern.finditer(lower):
+                pos = base + match.start()
+                index = bisect.bisect_right(self._block_starts, pos) - 1
+                block_end = self.block_offsets[index][1]
+                for needle in prefixes[match.group(1)]:
+                    if pos + len(needle) <= block_end:
+                        presence[needle][index] = 1
+        
+        self._presence.update(presence)
+    
+    def _scan_keyword_presence(self, needle: bytes) -> bytearray:
+        """
+        分段扫描小写的文件内容，建立单个关键词的块出现表
+        
+        Args:
+            needle: 小写字节形式的关键词
+            
+        Returns:
+            bytearray: 块出现表
+        """
+        if (self._stat[1] >= self.PARALLEL_SEARCH_MIN_SIZE
+                and len(self.block_offsets) >= self.PARALLEL_SEARCH_MIN_BLOCKS
+                and (os.cpu_count() or 1) > 1):
+            presence = self._scan_keyword_presence_parallel(needle)
+            if presence is not None:
+                return presence
+        
+        presence = bytearray(len(self.block_offsets))
+        for base, lower in self._lower_windows(len(needle) - 1):
+            pos = lower.find(needle)
+            while pos != -1:
+                index = bisect.bisect_right(self._block_starts, base + pos) - 1
+                block_end = self.block_offsets[index][1]
+                if base + pos + len(needle) <= block_end:
+                    presence[index] = 1
+                    # 该块已命中，从下一个块开始继续扫描
+                    pos = lower.find(needle, block_end - base)
+                else:
+                    # 命中跨越块边界，不属于任何一个块
+                    pos = lower.find(needle, pos + 1)
+        return presence
+    
+    def _scan_keyword_presence_parallel(self, needle: bytes) -> Optional[bytearray]:
+        """
+        将块按CPU核数分段，在多个进程中并行建立关键词的块出现表
+        
+        Args:
+            needle: 小写字节形式的关键词
+            
+        Returns:
+            Optional[bytearray]: 块出现表，进程池不可用时返回None
+        """
+        block_count = len(self.block_offsets)
+        chunk_size = -(-block_count // (os.cpu_count() or 1))
+        chunks = range(0, block_count, chunk_size)
+        
+        try:
+            pool = get_process_pool()
+            futures = [
+                pool.submit(_scan_blocks_range, self.filename,
+                            self.block_offsets[first:first + chunk_size], needle)
+                for first in chunks
+            ]
+            presence = bytearray(block_count)
+            for first, future in zip(chunks, futures):
+                for i in future.result():
+                    presence[first + i] = 1
+            return presence
+        except (OSError, ValueError, concurrent.futures.BrokenExecutor):
+            return None
     
     def search_blocks(self, keyword: str) -> List[int]:
         """
         搜索包含关键词的块，返回匹配的块索引列表
         
+        分段在小写的文件内容上做一次线性扫描，再按块偏移表定位命中所在的块。
+        每个关键词的结果以块出现表的形式缓存，再次过滤同一关键词时无需扫描。
+        
         Args:
             keyword: 要搜索的关键词
             
         Returns:
             List[int]: 匹配块的索引列表
         """
-        if not keyword or not self.blocks:
+        if not keyword or not self.block_offsets:
             return []
-            
-        return [i for i, block in enumerate(self.blocks) 
-                if keyword.lower() in block.lower()]
+        
+        if needs_unicode_fold(keyword):
+            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+            return [i for i in range(len(self.block_offsets))
+                    if pattern.search(self.get_block(i))]
+        
+        needle = keyword.encode('utf-8').lower()
+        presence = self._presence.get(needle)
+        if presence is None:
+            if needle in self._indexed_keywords:
+                self._build_keyword_presence()
+                presence = self._presence[needle]
+            else:
+                presence = self._scan_keyword_presence(needle)
+                self._presence[needle] = presence
+        
+        matches = []
+        index = presence.find(1)
+        while index != -1:
+            matches.append(index)
+            index = presence.find(1, index + 1)
+        return matches
     
     def search_in_block(self, block_index: int, keyword: str) -> List[Tuple[int, str]]:
         """
@@ -143,11 +499,63 @@ class LogParser:
         Returns:
             List[Tuple[int, str]]: 匹配行的行号和内容列表
         """
-        if not keyword or block_index < 0 or block_index >= len(self.blocks):
+        if not keyword or block_index < 0 or block_index >= len(self.block_offsets):
+            return []
+        
+        if '\n' in keyword:
             return []
+        
+        if needs_unicode_fold(keyword):
+            return self._search_in_block_unicode(block_index, keyword)
+        
+        # 字节正则的忽略大小写只转换ASCII字母，直接在映射文件上查找，不复制块内容
+        pattern = re.compile(re.escape(keyword.encode('utf-8')), re.IGNORECASE)
+        start, end = self.block_offsets[block_index]
+        line_starts = self.get_line_starts(block_index)
+        
+        results = []
+        match = pattern.search(self._mm, start, end)
+        while match:
+            pos = match.start()
+            line = bisect.bisect_right(line_starts, pos - start) - 1
+            line_start = start + line_starts[line]
+            if line + 1 < len(line_starts):
+                line_end = start + line_starts[line + 1] - 1
+            else:
+                line_end = end
+            results.append((line, self._mm[line_start:line_end].decode('utf-8', errors='ignore')))
+            # 每行只记录一次，从下一行继续查找
+            match = pattern.search(self._mm, line_end, end)
+        return results
+    
+    def _search_in_block_unicode(self, block_index: int, keyword: str) -> List[Tuple[int, str]]:
+        """
+        按Unicode大小写规则在块内搜索关键词
+        
+        用预编译的不区分大小写正则扫描解码后的块，再通过行起始位置二分查找行号。
+        
+        Args:
+            block_index: 块索引
+            keyword: 要搜索的关键词
             
-        block = self.blocks[block_index]
-        lines = block.split('\n')
+        Returns:
+            List[Tuple[int, str]]: 匹配行的行号和内容列表
+        """
+        block = self.get_block(block_index)
+        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+        
+        line_starts = [0]
+        pos = block.find('\n')
+        while pos != -1:
+            line_starts.append(pos + 1)
+            pos = block.find('\n', pos + 1)
         
-        return [(i, line) for i, line in enumerate(lines)
-                if keyword.lower() in line.lower()] 
\ No newline at end of file
+        results = []
+        match = pattern.search(block)
+        while match:
+            line = bisect.bisect_right(line_starts, match.start()) - 1
+            line_end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(block)
+            results.append((line, block[line_starts[line]:line_end]))
+            # 每行只记录一次，从下一行继续查找
+            match = pattern.search(block, line_end)
+        return results
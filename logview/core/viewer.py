@@ -6,15 +6,26 @@
 
 from typing import List, Dict, Optional, Tuple, Any, Callable
 import os
-from .parser import LogParser
+import re
+import bisect
+import collections
+from .parser import LogParser, needs_unicode_fold
 from .highlighter import Highlighter
 
 
 class ViewerState:
     """查看器状态类，存储查看器的当前状态"""
+    
+    __slots__ = (
+        'current_block_index', 'filtered_indices', 'current_filtered_index',
+        'filter_mode', 'search_term', 'top_line', 'full_view_mode',
+        'show_line_numbers', 'highlight_enabled', 'help_mode', 'message',
+        'error', 'focus_keyword', 'focus_offset',
+    )
+    
     def __init__(self):
         self.current_block_index = 0
-        self.filtered_indices: List[int] = []
+        self.filtered_indices: Optional[List[int]] = None  # 未过滤时为None
         self.current_filtered_index = 0
         self.filter_mode = False
         self.search_term = ""
@@ -32,6 +43,9 @@ class ViewerState:
 class LogViewer:
     """日志查看器核心类，管理查看、导航和搜索功能"""
     
+    # 缓存编译结果的搜索词数量上限
+    SEARCH_CACHE_SIZE = 16
+    
     def __init__(self, filename: Optional[str] = None, separator: Optional[str] = None):
         """
         初始化查看器
@@ -42,7 +56,23 @@ class LogViewer:
         """
         self.parser = LogParser(filename, separator)
         self.highlighter = Highlighter()
+        # 常见关键词的块出现表在首次过滤时一次性建立
+        self.parser.add_indexed_keywords(self.highlighter.COMMON_KEYWORDS)
         self.state = ViewerState()
+        # 文件名（不含路径），加载文件时计算一次
+        self.file_basename = ""
+        # 当前搜索词预编译的不区分大小写正则，以及编译它时的搜索词
+        self._search_regex: Optional[re.Pattern] = None
+        self._search_regex_term = ""
+        # 在块的原始字节上搜索使用的正则，以及编译它时的搜索词
+        self._search_bytes_regex: Optional["re.Pattern[bytes]"] = None
+        self._search_bytes_term = ""
+        # 搜索词到编译后正则的LRU缓存，反复切换同几个搜索词时无需重新编译
+        self._compiled_patterns: "collections.OrderedDict[str, re.Pattern]" = collections.OrderedDict()
+        # 过滤模式下是否需要自动聚焦关键词，由 _rebuild_nav 更新
+        self._focus_active = False
+        # 当前模式下的导航处理函数，由 _rebuild_nav 设置
+        self._rebuild_nav()
         
         # 如果提供了文件名，立即加载并解析
         if filename:
@@ -61,6 +91,8 @@ class LogViewer:
         success = self.parser.load_file(filename)
         if success:
             self.parser.parse()
+            # 加载和解析都成功后才更新文件名，失败时保留原文件名
+            self.file_basename = os.path.basename(filename)
             # 重置状态
             self.reset_state()
             return True
@@ -70,11 +102,12 @@ class LogViewer:
         """重置查看器状态"""
         self.state.current_block_index = 0
         self.state.filter_mode = False
-        self.state.filtered_indices = list(range(len(self.parser.blocks)))
+        self.state.filtered_indices = None
         self.state.current_filtered_index = 0
         self.state.top_line = 0
-        self.state.message = f"已加载文件: {os.path.basename(self.parser.filename)}"
+        self.state.message = f"已加载文件: {self.file_basename}"
         self.state.error = False
+        self._rebuild_nav()
         # 保留focus_keyword设置
     
     def reparse_with_separator(self, separator_type: str = "grad", 
@@ -89,7 +122,7 @@ class LogViewer:
         Returns:
             bool: 是否成功重新解析
         """
-        if not self.parser.content:
+        if not self.parser.has_content():
             self.state.message = "没有加载文件"
             self.state.error = True
             return False
@@ -113,6 +146,76 @@ class LogViewer:
         actual_index = self.get_actual_index()
         return self.parser.get_block(actual_index)
     
+    def get_current_block_view(self) -> Optional[memoryview]:
+        """
+        获取当前数据块的原始字节视图
+        
+        Returns:
+            Optional[memoryview]: 当前数据块在映射文件中的字节视图，如果没有则返回None
+        """
+        if not self.parser.blocks:
+            return None
+        return self.parser.get_block_view(self.get_actual_index())
+    
+    def _get_line_count(self, index: int) -> int:
+        """
+        获取指定块的行数，只统计换行符，不需要分行
+        
+        Args:
+            index: 块索引
+            
+        Returns:
+            int: 块的行数
+        """
+        return self.parser.get_line_count(index)
+    
+    def get_current_lines(self) -> List[str]:
+        """
+        获取当前数据块分行后的内容
+        
+        Returns:
+            List[str]: 当前块中的各行，没有数据时返回空列表
+        """
+        return self.get_current_line_range(0, self.get_current_line_count())
+    
+    def get_current_line_count(self) -> int:
+        """
+        获取当前数据块的行数，同时建立并缓存该块的行起始偏移表
+        
+        Returns:
+            int: 当前块的行数，没有数据时返回0
+        """
+        if not self.parser.blocks:
+            return 0
+        return len(self.parser.get_line_starts(self.get_actual_index()))
+    
+    def get_current_line_range(self, start: int, stop: int) -> List[str]:
+        """
+        获取当前数据块中指定范围的行
+        
+        按行起始偏移表只解码并分割这一范围的字节，不需要解码和分割整个块。
+        换行符不会出现在多字节UTF-8字符内部，因此结果与整块解码后分行相同。
+        
+        Args:
+            start: 起始行号
+            stop: 结束行号（不含）
+            
+        Returns:
+            List[str]: 范围内的各行，超出块末尾的部分被忽略
+        """
+        if not self.parser.blocks:
+            return []
+        
+        index = self.get_actual_index()
+        line_starts = self.parser.get_line_starts(index)
+        stop = min(stop, len(line_starts))
+        if start >= stop:
+            return []
+        
+        view = self.parser.get_block_view(index)
+        end = line_starts[stop] - 1 if stop < len(line_starts) else len(view)
+        return view[line_starts[start]:end].tobytes().decode('utf-8', errors='ignore').split('\n')
+    
     def get_actual_index(self) -> int:
         """
         获取当前块的实际索引
@@ -138,35 +241,167 @@ class LogViewer:
         return len(self.parser.blocks)
     
     # 导航方法
-    def next_block(self) -> bool:
+    def _step_block(self, delta: int) -> bool:
         """
-        移动到下一个块
+        按过滤模式向前或向后移动一个块，不改变顶部行也不触发关键词聚焦
         
+        Args:
+            delta: 移动方向，1为下一个块，-1为上一个块
+            
         Returns:
-            bool: 是否成功导航
+            bool: 是否成功移动
         """
-        if not self.parser.blocks:
-            return False
-            
         if self.state.filter_mode and self.state.filtered_indices:
-            if self.state.current_filtered_index < len(self.state.filtered_indices) - 1:
-                self.state.current_filtered_index += 1
-                self.state.current_block_index = self.state.filtered_indices[self.state.current_filtered_index]
-                self.state.top_line = 0  # 重置顶部行
-                
-                # 如果启用了关键词聚焦，自动定位到第一个关键词位置
-                if self.state.focus_keyword and self.state.search_term:
-                    self._focus_on_keyword()
-                    
+            new_index = self.state.current_filtered_index + delta
+            if 0 <= new_index < len(self.state.filtered_indices):
+                self.state.current_filtered_index = new_index
+                self.state.current_block_index = self.state.filtered_indices[new_index]
                 return True
         elif not self.state.filter_mode:
-            if self.state.current_block_index < len(self.parser.blocks) - 1:
-                self.state.current_block_index += 1
-                self.state.top_line = 0  # 重置顶部行
+            new_index = self.state.current_block_index + delta
+            if 0 <= new_index < len(self.parser.blocks):
+                self.state.current_block_index = new_index
                 return True
-                
         return False
     
+    def _rebuild_nav(self) -> None:
+        """
+        根据过滤模式和关键词聚焦设置选择导航处理函数
+        
+        在模式切换时调用一次，导航时不再逐次判断过滤模式和聚焦设置。
+        """
+        filtered = bool(self.state.filter_mode and self.state.filtered_indices)
+        self._focus_active = bool(filtered and self.state.focus_keyword and self.state.search_term)
+        
+        if filtered:
+            handlers = (self._next_filtered, self._prev_filtered, self._first_filtered,
+                        self._last_filtered, self._goto_filtered)
+            # 过滤模式下启用了关键词聚焦时，导航成功后自动定位到第一个关键词位置
+            if self._focus_active:
+                handlers = tuple(self._with_focus(handler) for handler in handlers)
+        elif self.state.filter_mode:
+            # 过滤结果为空时不能前后移动
+            handlers = (self._stay, self._stay, self._first_unfiltered,
+                        self._last_unfiltered, self._goto_unfiltered)
+        else:
+            handlers = (self._next_unfiltered, self._prev_unfiltered, self._first_unfiltered,
+                        self._last_unfiltered, self._goto_unfiltered)
+        (self._nav_next, self._nav_prev, self._nav_first,
+         self._nav_last, self._nav_goto) = handlers
+    
+    def _with_focus(self, handler: Callable[..., bool]) -> Callable[..., bool]:
+        """
+        包装导航处理函数，导航成功后聚焦关键词
+        
+        Args:
+            handler: 导航处理函数
+            
+        Returns:
+            Callable[..., bool]: 包装后的处理函数
+        """
+        def navigate(*args) -> bool:
+            if handler(*args):
+                self._focus_on_keyword()
+                return True
+            return False
+        return navigate
+    
+    def _stay(self) -> bool:
+        """不移动的导航处理函数"""
+        return False
+    
+    def _next_filtered(self) -> bool:
+        """过滤模式下移动到下一个块"""
+        if self.state.current_filtered_index < len(self.state.filtered_indices) - 1:
+            self.state.current_filtered_index += 1
+            self.state.current_block_index = self.state.filtered_indices[self.state.current_filtered_index]
+            self.state.top_line = 0  # 重置顶部行
+            return True
+        return False
+    
+    def _prev_filtered(self) -> bool:
+        """过滤模式下移动到上一个块"""
+        if self.state.current_filtered_index > 0:
+            self.state.current_filtered_index -= 1
+            self.state.current_block_index = self.state.filtered_indices[self.state.current_filtered_index]
+            self.state.top_line = 0  # 重置顶部行
+            return True
+        return False
+    
+    def _first_filtered(self) -> bool:
+        """过滤模式下移动到第一个块"""
+        self.state.current_filtered_index = 0
+        self.state.current_block_index = self.state.filtered_indices[0]
+        self.state.top_line = 0  # 重置顶部行
+        return True
+    
+    def _last_filtered(self) -> bool:
+        """过滤模式下移动到最后一个块"""
+        self.state.current_filtered_index = len(self.state.filtered_indices) - 1
+        self.state.current_block_index = self.state.filtered_indices[-1]
+        self.state.top_line = 0  # 重置顶部行
+        return True
+    
+    def _goto_filtered(self, block_num: int) -> bool:
+        """过滤模式下跳转到指定的过滤块"""
+        if block_num <= len(self.state.filtered_indices):
+            self.state.current_filtered_index = block_num - 1
+            self.state.current_block_index = self.state.filtered_indices[self.state.current_filtered_index]
+            self.state.top_line = 0  # 重置顶部行
+            return True
+        self.state.message = f"块编号超出范围 (1-{len(self.state.filtered_indices)})"
+        self.state.error = True
+        return False
+    
+    def _next_unfiltered(self) -> bool:
+        """分块模式下移动到下一个块"""
+        if self.state.current_block_index < len(self.parser.blocks) - 1:
+            self.state.current_block_index += 1
+            self.state.top_line = 0  # 重置顶部行
+            return True
+        return False
+    
+    def _prev_unfiltered(self) -> bool:
+        """分块模式下移动到上一个块"""
+        if self.state.current_block_index > 0:
+            self.state.current_block_index -= 1
+            self.state.top_line = 0  # 重置顶部行
+            return True
+        return False
+    
+    def _first_unfiltered(self) -> bool:
+        """分块模式下移动到第一个块"""
+        self.state.current_block_index = 0
+        self.state.top_line = 0  # 重置顶部行
+        return True
+    
+    def _last_unfiltered(self) -> bool:
+        """分块模式下移动到最后一个块"""
+        self.state.current_block_index = len(self.parser.blocks) - 1
+        self.state.top_line = 0  # 重置顶部行
+        return True
+    
+    def _goto_unfiltered(self, block_num: int) -> bool:
+        """分块模式下跳转到指定块"""
+        if block_num <= len(self.parser.blocks):
+            self.state.current_block_index = block_num - 1
+            self.state.top_line = 0  # 重置顶部行
+            return True
+        self.state.message = f"块编号超出范围 (1-{len(self.parser.blocks)})"
+        self.state.error = True
+        return False
+    
+    def next_block(self) -> bool:
+        """
+        移动到下一个块
+        
+        Returns:
+            bool: 是否成功导航
+        """
+        if not self.parser.blocks:
+            return False
+        return self._nav_next()
+    
     def prev_block(self) -> bool:
         """
         移动到上一个块
@@ -176,25 +411,7 @@ class LogViewer:
         """
         if not self.parser.blocks:
             return False
-            
-        if self.state.filter_mode and self.state.filtered_indices:
-            if self.state.current_filtered_index > 0:
-                self.state.current_filtered_index -= 1
-                self.state.current_block_index = self.state.filtered_indices[self.state.current_filtered_index]
-                self.state.top_line = 0  # 重置顶部行
-                
-                # 如果启用了关键词聚焦，自动定位到第一个关键词位置
-                if self.state.focus_keyword and self.state.search_term:
-                    self._focus_on_keyword()
-                    
-                return True
-        elif not self.state.filter_mode:
-            if self.state.current_block_index > 0:
-                self.state.current_block_index -= 1
-                self.state.top_line = 0  # 重置顶部行
-                return True
-                
-        return False
+        return self._nav_prev()
     
     def first_block(self) -> bool:
         """
@@ -205,20 +422,7 @@ class LogViewer:
         """
         if not self.parser.blocks:
             return False
-            
-        if self.state.filter_mode and self.state.filtered_indices:
-            self.state.current_filtered_index = 0
-            self.state.current_block_index = self.state.filtered_indices[0]
-        else:
-            self.state.current_block_index = 0
-            
-        self.state.top_line = 0  # 重置顶部行
-        
-        # 如果启用了关键词聚焦，自动定位到第一个关键词位置
-        if self.state.filter_mode and self.state.focus_keyword and self.state.search_term:
-            self._focus_on_keyword()
-            
-        return True
+        return self._nav_first()
     
     def last_block(self) -> bool:
         """
@@ -229,20 +433,7 @@ class LogViewer:
         """
         if not self.parser.blocks:
             return False
-            
-        if self.state.filter_mode and self.state.filtered_indices:
-            self.state.current_filtered_index = len(self.state.filtered_indices) - 1
-            self.state.current_block_index = self.state.filtered_indices[-1]
-        else:
-            self.state.current_block_index = len(self.parser.blocks) - 1
-            
-        self.state.top_line = 0  # 重置顶部行
-        
-        # 如果启用了关键词聚焦，自动定位到第一个关键词位置
-        if self.state.filter_mode and self.state.focus_keyword and self.state.search_term:
-            self._focus_on_keyword()
-            
-        return True
+        return self._nav_last()
     
     def goto_block(self, block_num: int) -> bool:
         """
@@ -256,31 +447,7 @@ class LogViewer:
         """
         if not self.parser.blocks or block_num < 1:
             return False
-            
-        if self.state.filter_mode and self.state.filtered_indices:
-            if block_num <= len(self.state.filtered_indices):
-                self.state.current_filtered_index = block_num - 1
-                self.state.current_block_index = self.state.filtered_indices[self.state.current_filtered_index]
-                self.state.top_line = 0  # 重置顶部行
-                
-                # 如果启用了关键词聚焦，自动定位到第一个关键词位置
-                if self.state.focus_keyword and self.state.search_term:
-                    self._focus_on_keyword()
-                    
-                return True
-            else:
-                self.state.message = f"块编号超出范围 (1-{len(self.state.filtered_indices)})"
-                self.state.error = True
-                return False
-        else:
-            if block_num <= len(self.parser.blocks):
-                self.state.current_block_index = block_num - 1
-                self.state.top_line = 0  # 重置顶部行
-                return True
-            else:
-                self.state.message = f"块编号超出范围 (1-{len(self.parser.blocks)})"
-                self.state.error = True
-                return False
+        return self._nav_goto(block_num)
 
     def _focus_on_keyword(self) -> bool:
         """
@@ -306,10 +473,8 @@ class LogViewer:
         new_top_line = max(0, matched_line - self.state.focus_offset)
         
         # 确保不超过文件行数
-        block = self.get_current_block()
-        if block:
-            total_lines = len(block.split('\n'))
-            new_top_line = min(new_top_line, max(0, total_lines - 1))
+        total_lines = self._get_line_count(actual_index)
+        new_top_line = min(new_top_line, max(0, total_lines - 1))
         
         self.state.top_line = new_top_line
         return True
@@ -323,7 +488,136 @@ class LogViewer:
             term: 搜索关键词
         """
         self.state.search_term = term
-        self.highlighter.set_search_pattern(term)
+        self._search_regex = self._compile_search(term) if term else None
+        self._search_regex_term = term
+        self.highlighter.set_search_pattern(term, regex=self._search_regex)
+        self._rebuild_nav()
+    
+    def get_search_regex(self) -> Optional[re.Pattern]:
+        """
+        获取当前搜索词的预编译正则，搜索词被直接修改时重新编译
+        
+        搜索导航和界面的搜索高亮共用这一个正则。
+        
+        Returns:
+            Optional[re.Pattern]: 不区分大小写的搜索正则，没有搜索词时为None
+        """
+        term = self.state.search_term
+        if not term:
+            return None
+        if self._search_regex is None or term != self._search_regex_term:
+            self._search_regex = self._compile_search(term)
+            self._search_regex_term = term
+        return self._search_regex
+    
+    def _compile_search(self, term: str) -> re.Pattern:
+        """
+        编译搜索词为不区分大小写的正则，结果按搜索词缓存
+        
+        Args:
+            term: 搜索关键词
+            
+        Returns:
+            re.Pattern: 编译后的正则
+        """
+        regex = self._compiled_patterns.get(term)
+        if regex is not None:
+            self._compiled_patterns.move_to_end(term)
+            return regex
+        
+        regex = re.compile(re.escape(term), re.IGNORECASE)
+        self._compiled_patterns[term] = regex
+        if len(self._compiled_patterns) > self.SEARCH_CACHE_SIZE:
+            self._compiled_patterns.popitem(last=False)
+        return regex
+    
+    def _get_bytes_search_regex(self) -> Optional["re.Pattern[bytes]"]:
+        """
+        获取在块原始字节上搜索当前搜索词的正则
+        
+        字节正则的忽略大小写只作用于ASCII字母，搜索词含有区分大小写的非ASCII字符时返回None，
+        由调用方改为在解码后的文本上搜索。
+        
+        Returns:
+            Optional[re.Pattern[bytes]]: 不区分大小写的字节正则，不能按字节搜索时为None
+        """
+        term = self.state.search_term
+        if needs_unicode_fold(term):
+            return None
+        if self._search_bytes_regex is None or term != self._search_bytes_term:
+            self._search_bytes_regex = re.compile(re.escape(term.encode('utf-8')), re.IGNORECASE)
+            self._search_bytes_term = term
+        return self._search_bytes_regex
+    
+    def _find_in_block(self, index: int, start_line: int, stop_line: Optional[int] = None,
+                       last: bool = False) -> Optional[int]:
+        """
+        在块的指定行范围内查找搜索词
+        
+        直接在映射文件的字节视图上搜索，用解析器缓存的行起始偏移表把匹配位置换算为行号，
+        不需要解码和分割整个块。
+        
+        Args:
+            index: 块索引
+            start_line: 起始行号
+            stop_line: 结束行号（不含），为None时查找到块末尾
+            last: 为True时返回范围内最后一个匹配，否则返回第一个
+            
+        Returns:
+            Optional[int]: 匹配所在的行号，没有匹配时返回None
+        """
+        line_starts = self.parser.get_line_starts(index)
+        if stop_line is None or stop_line > len(line_starts):
+            stop_line = len(line_starts)
+        start_line = max(0, start_line)
+        if start_line >= stop_line:
+            return None
+        
+        view = self.parser.get_block_view(index)
+        begin = line_starts[start_line]
+        end = line_starts[stop_line] - 1 if stop_line < len(line_starts) else len(view)
+        
+        regex = self._get_bytes_search_regex()
+        if regex is not None:
+            text, pos, endpos = view, begin, end
+        else:
+            # 需要Unicode大小写折叠时只解码这一范围的行
+            regex = self.get_search_regex()
+            text = view[begin:end].tobytes().decode('utf-8', errors='ignore')
+            pos, endpos = 0, len(text)
+        
+        match = None
+        if last:
+            for match in regex.finditer(text, pos, endpos):
+                pass
+        else:
+            match = regex.search(text, pos, endpos)
+        if match is None:
+            return None
+        
+        if text is view:
+            return bisect.bisect_right(line_starts, match.start()) - 1
+        return start_line + text.count('\n', 0, match.start())
+    
+    def _save_position(self) -> Tuple[int, int, int]:
+        """
+        记录当前位置，用于查找失败时恢复
+        
+        Returns:
+            Tuple[int, int, int]: (块索引, 过滤块索引, 顶部行号)
+        """
+        state = self.state
+        return state.current_block_index, state.current_filtered_index, state.top_line
+    
+    def _restore_position(self, position: Tuple[int, int, int]) -> None:
+        """
+        恢复 _save_position 记录的位置
+        
+        Args:
+            position: (块索引, 过滤块索引, 顶部行号)
+        """
+        state = self.state
+        state.current_block_index, state.current_filtered_index, state.top_line = position
     
     def search_next(self) -> bool:
         """
@@ -334,33 +628,22 @@ class LogViewer:
         """
         if not self.state.search_term or not self.parser.blocks:
             return False
+        
+        origin = self._save_position()
+        # 从当前行的下一行开始查找
+        start_line = self.state.top_line + 1
+        while True:
+            line = self._find_in_block(self.get_actual_index(), start_line)
+            if line is not None:
+                self.state.top_line = line
+                return True
             
-        # 获取当前块内容并分行
-        actual_index = self.get_actual_index()
-        block = self.parser.get_block(actual_index)
-        if not block:
-            return False
-            
-        lines = block.split('\n')
-        
-        # 从当前行开始查找
-        found = False
-        for i in range(self.state.top_line + 1, len(lines)):
-            if self.state.search_term.lower() in lines[i].lower():
-                self.state.top_line = i
-                found = True
-                break
-        
-        if not found:
-            # 尝试下一个块
-            if self.next_block():
-                # 递归调用以在新块中查找
-                return self.search_next()
-            else:
+            # 没有匹配时移到下一个块，从第一行开始查找；没有更多块时回到原来的位置
+            if not self._step_block(1):
+                self._restore_position(origin)
                 self.state.message = "已到达最后一个搜索结果"
                 return False
-        
-        return True
+            start_line = 0
     
     def search_prev(self) -> bool:
         """
@@ -371,40 +654,22 @@ class LogViewer:
         """
         if not self.state.search_term or not self.parser.blocks:
             return False
+        
+        origin = self._save_position()
+        # 在当前行之前的各行中查找最后一个匹配
+        stop_line: Optional[int] = self.state.top_line
+        while True:
+            line = self._find_in_block(self.get_actual_index(), 0, stop_line, last=True)
+            if line is not None:
+                self.state.top_line = line
+                return True
             
-        # 获取当前块内容并分行
-        actual_index = self.get_actual_index()
-        block = self.parser.get_block(actual_index)
-        if not block:
-            return False
-            
-        lines = block.split('\n')
-        
-        # 从当前行开始向上查找
-        found = False
-        for i in range(self.state.top_line - 1, -1, -1):
-            if self.state.search_term.lower() in lines[i].lower():
-                self.state.top_line = i
-                found = True
-                break
-        
-        if not found:
-            # 尝试上一个块
-            if self.prev_block():
-                # 先移到最后一行，然后向上搜索
-                actual_index = self.get_actual_index()
-                block = self.parser.get_block(actual_index)
-                if block:
-                    lines = block.split('\n')
-                    self.state.top_line = len(lines) - 1
-                
-                # 递归调用以在新块中查找
-                return self.search_prev()
-            else:
+            # 没有匹配时移到上一个块，在整个块中向上查找；没有更多块时回到原来的位置
+            if not self._step_block(-1):
+                self._restore_position(origin)
                 self.state.message = "已到达第一个搜索结果"
                 return False
-        
-        return True
+            stop_line = None
     
     def filter_blocks(self) -> bool:
         """
@@ -419,17 +684,19 @@ class LogViewer:
         self.state.filtered_indices = self.parser.search_blocks(self.state.search_term)
         
         if not self.state.filtered_indices:
+            self._rebuild_nav()
             self.state.message = "没有找到匹配的数据块"
             self.state.error = True
             return False
         
         self.state.filter_mode = True
+        self._rebuild_nav()
         self.state.current_filtered_index = 0
         self.state.current_block_index = self.state.filtered_indices[0]
         self.state.top_line = 0
         
         # 如果启用了关键词聚焦，自动定位到第一个关键词位置
-        if self.state.focus_keyword:
+        if self._focus_active:
             self._focus_on_keyword()
             
         self.state.message = f"找到 {len(self.state.filtered_indices)} 个匹配的数据块"
@@ -438,7 +705,8 @@ class LogViewer:
     def clear_filter(self) -> None:
         """清除过滤"""
         self.state.filter_mode = False
-        self.state.filtered_indices = list(range(len(self.parser.blocks)))
+        self.state.filtered_indices = None
+        self._rebuild_nav()
         self.state.message = "已清除过滤"
     
     # 文件操作
@@ -457,14 +725,14 @@ class LogViewer:
             self.state.error = True
             return False
             
-        actual_index = self.get_actual_index()
-        block = self.parser.get_block(actual_index)
-        if not block:
+        view = self.get_current_block_view()
+        if not view:
             return False
             
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
-                file.write(block)
+            # 直接写出块的原始字节，无需解码再编码
+            with view, open(filename, 'wb') as file:
+                file.write(view)
             self.state.message = f"当前数据块已保存到: {filename}"
             return True
         except Exception as e:
@@ -512,13 +780,9 @@ class LogViewer:
         Returns:
             bool: 是否成功滚动
         """
-        if self.state.top_line >= lines:
-            self.state.top_line -= lines
-            return True
-        elif self.state.top_line > 0:
-            self.state.top_line = 0
-            return True
-        return False
+        top_line = self.state.top_line
+        self.state.top_line = max(0, top_line - lines)
+        return self.state.top_line != top_line
     
     def scroll_down(self, lines: int = 1) -> bool:
         """
@@ -531,19 +795,15 @@ class LogViewer:
             bool: 是否成功滚动
         """
         # 获取当前块的总行数
-        block = self.get_current_block()
-        if not block:
+        if not self.parser.blocks:
             return False
             
-        total_lines = len(block.split('\n'))
+        total_lines = self._get_line_count(self.get_actual_index())
         
-        if self.state.top_line + lines < total_lines:
-            self.state.top_line += lines
-            return True
-        elif self.state.top_line < total_lines - 1:
-            self.state.top_line = total_lines - 1
-            return True
-        return False
+        # 最多滚动到最后一行，已经越过最后一行时保持不动
+        top_line = self.state.top_line
+        self.state.top_line = min(top_line + lines, max(top_line, total_lines - 1))
+        return self.state.top_line != top_line
     
     def page_up(self, page_size: int) -> bool:
         """
@@ -575,10 +835,9 @@ class LogViewer:
     
     def scroll_to_bottom(self) -> None:
         """滚动到底部"""
-        block = self.get_current_block()
-        if block:
-            lines = block.split('\n')
-            self.state.top_line = max(0, len(lines) - 1)
+        if self.parser.blocks:
+            total_lines = self._get_line_count(self.get_actual_index())
+            self.state.top_line = max(0, total_lines - 1)
     
     # 状态控制
     def set_message(self, message: str, error: bool = False) -> None:
@@ -600,11 +859,12 @@ class LogViewer:
     def toggle_keyword_focus(self) -> None:
         """切换关键词聚焦功能"""
         self.state.focus_keyword = not self.state.focus_keyword
+        self._rebuild_nav()
         
         if self.state.focus_keyword:
             self.state.message = "已启用关键词聚焦 (+ - 调整聚焦位置)"
             # 如果已经在过滤模式并有搜索词，立即聚焦
-            if self.state.filter_mode and self.state.search_term:
+            if self._focus_active:
                 self._focus_on_keyword()
         else:
             self.state.message = "已禁用关键词聚焦"
@@ -617,7 +877,7 @@ class LogViewer:
             self.state.message = f"聚焦偏移量: {self.state.focus_offset}行"
             
             # 如果当前处于聚焦模式，立即应用新的偏移量
-            if self.state.focus_keyword and self.state.filter_mode and self.state.search_term:
+            if self._focus_active:
                 self._focus_on_keyword()
     
     def decrease_focus_offset(self) -> None:
@@ -628,5 +888,5 @@ class LogViewer:
             self.state.message = f"聚焦偏移量: {self.state.focus_offset}行"
             
             # 如果当前处于聚焦模式，立即应用新的偏移量
-            if self.state.focus_keyword and self.state.filter_mode and self.state.search_term:
+            if self._focus_active:
                 self._focus_on_keyword() 
\ No newline at end of file
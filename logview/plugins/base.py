@@ -4,17 +4,47 @@
 定义插件的基础接口和加载机制。
 """
 
-from typing import Dict, List, Any, Optional, Type
+from typing import Dict, List, Any, Optional, Type, ClassVar
 from abc import ABC, abstractmethod
-import importlib
 import os
-import sys
-import inspect
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class Plugin(ABC):
     """插件基类，所有插件必须继承此类"""
     
+    __slots__ = ('name', 'description', 'enabled')
+    
+    # 已定义的插件子类，定义子类时自动登记，发现插件时无需遍历模块成员
+    _subclasses: List[Type["Plugin"]] = []
+    
+    # 是否可以与其他插件并行初始化，依赖初始化顺序的插件应设为False
+    parallel_init = True
+    
+    # 通过类定义关键字参数声明的插件名称和描述，例如 class P(Plugin, name="p")，
+    # 与实例槽位不同名，子类可以继续使用 __slots__
+    plugin_name: ClassVar[Optional[str]] = None
+    plugin_description: ClassVar[Optional[str]] = None
+    
+    def __init_subclass__(cls, name: Optional[str] = None,
+                          description: Optional[str] = None, **kwargs):
+        """
+        登记新定义的插件子类
+        
+        Args:
+            name: 插件名称
+            description: 插件描述
+        """
+        super().__init_subclass__(**kwargs)
+        if name is not None:
+            cls.plugin_name = name
+        if description is not None:
+            cls.plugin_description = description
+        Plugin._subclasses.append(cls)
+    
     def __init__(self, name: str, description: str):
         """
         初始化插件
@@ -60,6 +90,28 @@ class Plugin(ABC):
         return self.enabled
 
 
+def _class_attr(plugin_class: Type[Plugin], attr: str, default: str) -> str:
+    """
+    读取插件类上声明的字符串属性
+
+    优先使用类定义关键字参数声明的 plugin_<attr>，其次是同名类属性。
+    Plugin 使用 __slots__，子类未声明该属性时类上取到的是槽描述符而不是字符串。
+
+    Args:
+        plugin_class: 插件类
+        attr: 属性名
+        default: 未声明时的默认值
+
+    Returns:
+        str: 属性值
+    """
+    value = getattr(plugin_class, 'plugin_' + attr, None)
+    if isinstance(value, str):
+        return value
+    value = getattr(plugin_class, attr, default)
+    return value if isinstance(value, str) else default
+
+
 class PluginManager:
     """插件管理器，负责插件的加载、注册和管理"""
     
@@ -67,20 +119,31 @@ class PluginManager:
         """初始化插件管理器"""
         self.plugins: Dict[str, Plugin] = {}
         self.plugin_classes: Dict[str, Type[Plugin]] = {}
+        # 注册时创建但尚未加载的插件实例，加载时直接复用
+        self._instances: Dict[str, Plugin] = {}
+        # 加载、初始化或卸载失败的插件及对应的异常，供之后查看
+        self.failed_plugins: Dict[str, Exception] = {}
     
-    def register_plugin_class(self, plugin_class: Type[Plugin]) -> None:
+    def register_plugin_class(self, plugin_class: Type[Plugin]) -> Optional[Plugin]:
         """
         注册插件类
         
         Args:
             plugin_class: 插件类
+            
+        Returns:
+            Optional[Plugin]: 注册时创建的插件实例，之后加载该插件时会复用此实例；
+                如果不是有效的插件类则返回None
         """
         if issubclass(plugin_class, Plugin) and plugin_class is not Plugin:
             instance = plugin_class(
-                getattr(plugin_class, 'name', plugin_class.__name__),
-                getattr(plugin_class, 'description', '')
+                _class_attr(plugin_class, 'name', plugin_class.__name__),
+                _class_attr(plugin_class, 'description', '')
             )
             self.plugin_classes[instance.name] = plugin_class
+            self._instances[instance.name] = instance
+            return instance
+        return None
     
     def discover_plugins(self, plugins_dir: str = None) -> None:
         """
@@ -89,6 +152,10 @@ class PluginManager:
         Args:
             plugins_dir: 插件目录路径，如果为None则使用当前模块的目录
         """
+        # 只有发现插件时才需要这些模块
+        import importlib
+        import sys
+        
         if plugins_dir is None:
             # 使用当前模块的目录
             plugins_dir = os.path.dirname(os.path.abspath(__file__))
@@ -102,16 +169,18 @@ class PluginManager:
             if filename.endswith('.py') and not filename.startswith('__'):
                 module_name = filename[:-3]
                 try:
-                    # 导入模块
+                    # 导入模块，模块中的插件类在定义时已自动登记
                     module = importlib.import_module(module_name)
                     
-                    # 查找模块中的插件类
-                    for name, obj in inspect.getmembers(module):
-                        if inspect.isclass(obj) and issubclass(obj, Plugin) and obj is not Plugin:
-                            self.register_plugin_class(obj)
+                    # 注册该模块中定义的具体插件类
+                    for plugin_class in Plugin._subclasses:
+                        if (plugin_class.__module__ == module.__name__
+                                and not getattr(plugin_class, '__abstractmethods__', None)):
+                            self.register_plugin_class(plugin_class)
                             
                 except (ImportError, AttributeError) as e:
-                    print(f"加载插件 {module_name} 时出错: {e}")
+                    logger.debug("加载插件 %s 时出错: %s", module_name, e)
+                    self.failed_plugins[module_name] = e
     
     def load_plugin(self, name: str, context: Any) -> Optional[Plugin]:
         """
@@ -126,12 +195,15 @@ class PluginManager:
         """
         if name in self.plugin_classes:
             try:
-                plugin = self.plugin_classes[name](name, getattr(self.plugin_classes[name], 'description', ''))
+                plugin = self._instances.pop(name, None)
+                if plugin is None:
+                    plugin = self.plugin_classes[name](name, _class_attr(self.plugin_classes[name], 'description', ''))
                 plugin.initialize(context)
                 self.plugins[name] = plugin
                 return plugin
             except Exception as e:
-                print(f"初始化插件 {name} 时出错: {e}")
+                logger.debug("初始化插件 %s 时出错: %s", name, e)
+                self.failed_plugins[name] = e
                 return None
         return None
     
@@ -142,8 +214,22 @@ class PluginManager:
         Args:
             context: 传递给插件初始化方法的上下文
         """
-        for name in list(self.plugin_classes.keys()):
-            self.load_plugin(name, context)
+        names = list(self.plugin_classes.keys())
+        parallel = [name for name in names if self.plugin_classes[name].parallel_init]
+        
+        # 初始化可能涉及文件读取，可并行的插件放到线程池中同时初始化
+        if len(parallel) > 1:
+            import concurrent.futures
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(parallel))) as pool:
+                concurrent.futures.wait([pool.submit(self.load_plugin, name, context)
+                                         for name in parallel])
+        elif parallel:
+            self.load_plugin(parallel[0], context)
+        
+        # 依赖顺序的插件在其余插件初始化完成后按注册顺序逐个初始化
+        for name in names:
+            if not self.plugin_classes[name].parallel_init:
+                self.load_plugin(name, context)
     
     def get_plugin(self, name: str) -> Optional[Plugin]:
         """
@@ -182,7 +268,8 @@ class PluginManager:
                 del self.plugins[name]
                 return True
             except Exception as e:
-                print(f"卸载插件 {name} 时出错: {e}")
+                logger.debug("卸载插件 %s 时出错: %s", name, e)
+                self.failed_plugins[name] = e
         return False
     
     def unload_all_plugins(self) -> None:
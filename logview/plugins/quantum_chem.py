@@ -4,21 +4,278 @@
 为量子化学程序(如Gaussian、ORCA等)的输出文件提供特定功能。
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, Optional
 from .base import Plugin
+from ..core.highlighter import merge_keyword_styles
 import re
+import os
+import sys
+import mmap
+import array
+import functools
+import itertools
+import concurrent.futures
 from ..utils.config import (
     load_separators, DEFAULT_SEPARATORS, 
     load_keyword_types, DEFAULT_KEYWORD_TYPES, 
     save_keyword_types
 )
+from ..utils.pool import get_process_pool
 
 
-class QuantumChemPlugin(Plugin):
+# 文件类型检测读取的文件头大小，量子化学程序的特征字符串通常出现在开头
+DETECT_HEAD_SIZE = 64 * 1024
+
+# 量子化学软件输出文件的特征字符串
+DETECT_PATTERNS = [
+    "Gaussian",
+    "ORCA",
+    "GAMESS",
+    "Molpro",
+    "Q-Chem",
+    "NWChem",
+    "SCF Done",
+    "Optimization completed",
+    "Convergence criterion met"
+]
+
+# 所有特征字符串合并成的单个正则，一次扫描即可判断是否命中任一特征
+_DETECT_RE = re.compile(b"|".join(re.escape(pattern.encode()) for pattern in DETECT_PATTERNS))
+
+# IRC计算输出中的分隔标记
+_IRC_MARKER = b"--IRC--"
+
+# 能量和几何结构提取使用的正则，模块加载时编译一次
+_SCF_RE = re.compile(r"SCF Done:.*=\s*([-]?\d+\.\d+)")
+_ENERGY_RE = re.compile(r"Energy=\s*([-]?\d+\.\d+)")
+# 同样的模式的字节版本，直接在映射的文件上查找
+_SCF_RE_BYTES = re.compile(_SCF_RE.pattern.encode())
+_ENERGY_RE_BYTES = re.compile(_ENERGY_RE.pattern.encode())
+
+# 批量提取的块数不少于该值时分段交给进程池并行处理
+PARALLEL_EXTRACT_MIN_BLOCKS = 64
+
+# 坐标表中的一行原子数据：中心序号、原子序数、原子类型、X、Y、Z
+_ATOM_ROW_RE = re.compile(
+    r"^[ \t]*(\d+)[ \t]+(\d+)[ \t]+\d+[ \t]+(-?\d+\.\d+)[ \t]+(-?\d+\.\d+)[ \t]+(-?\d+\.\d+)",
+    re.MULTILINE
+)
+
+# 按原子序数索引的元素符号，0号为虚原子
+ATOMIC_SYMBOLS = (
+    "X",
+    "H", "He",
+    "Li", "Be", "B", "C", "N", "O", "F", "Ne",
+    "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar",
+    "K", "Ca", "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn",
+    "Ga", "Ge", "As", "Se", "Br", "Kr",
+    "Rb", "Sr", "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd",
+    "In", "Sn", "Sb", "Te", "I", "Xe",
+    "Cs", "Ba", "La", "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy",
+    "Ho", "Er", "Tm", "Yb", "Lu", "Hf", "Ta", "W", "Re", "Os", "Ir", "Pt",
+    "Au", "Hg", "Tl", "Pb", "Bi", "Po", "At", "Rn",
+    "Fr", "Ra", "Ac", "Th", "Pa", "U", "Np", "Pu", "Am", "Cm", "Bk", "Cf",
+    "Es", "Fm", "Md", "No", "Lr", "Rf", "Db", "Sg", "Bh", "Hs", "Mt", "Ds",
+    "Rg", "Cn", "Nh", "Fl", "Mc", "Lv", "Ts", "Og",
+)
+
+
+def _atom_symbol(atom_num: str) -> str:
+    """
+    获取原子序数对应的元素符号
+
+    Args:
+        atom_num: 原子序数文本
+
+    Returns:
+        str: 元素符号，超出范围时为 X
+    """
+    atom_num = int(atom_num)
+    return ATOMIC_SYMBOLS[atom_num] if atom_num < len(ATOMIC_SYMBOLS) else "X"
+
+
+@functools.lru_cache(maxsize=4096)
+def _atom_label(atom_num: str, center: str) -> str:
+    """
+    获取原子标签（元素符号加中心序号）
+
+    同一原子在轨迹的每一帧中都使用同一个字符串对象作为键，不为每帧重复创建。
+
+    Args:
+        atom_num: 原子序数文本
+        center: 中心序号文本
+
+    Returns:
+        str: 原子标签，如 C1
+    """
+    return sys.intern(f"{_atom_symbol(atom_num)}{center}")
+
+
+def _iter_orientation_rows(block: str):
+    """
+    遍历块中每个标准坐标表的原子数据行
+
+    Args:
+        block: 文本块内容
+
+    Yields:
+        List[Tuple[str, ...]]: 一个坐标表中各行的 (中心序号, 原子序数, X, Y, Z) 文本，不含空表
+    """
+    pos = block.find("Standard orientation:")
+    while pos != -1:
+        # 标题之后依次是分隔线、列名和第二条分隔线，原子数据从第二条分隔线的下一行开始
+        first_rule = block.find("-\n", pos)
+        if first_rule == -1:
+            return
+        second_rule = block.find("-\n", first_rule + 2)
+        if second_rule == -1:
+            return
+        rows_start = second_rule + 2
+
+        # 数据到下一条分隔线或转动常数为止，坐标中的负号不会连续出现
+        rows_end = block.find("--", rows_start)
+        rotational = block.find("Rotational constants", rows_start)
+        if rows_end == -1 or (rotational != -1 and rotational < rows_end):
+            rows_end = rotational if rotational != -1 else len(block)
+
+        # 只在坐标表范围内逐行匹配原子数据，由正则完成分列
+        rows = [row.groups() for row in _ATOM_ROW_RE.finditer(block, rows_start, rows_end)]
+        if rows:
+            yield rows
+        pos = block.find("Standard orientation:", rows_end)
+
+
+def _parse_geometries(block: str) -> List[Dict]:
+    """
+    从块中提取分子几何结构
+
+    Args:
+        block: 文本块内容
+
+    Returns:
+        List[Dict]: 几何结构列表，每个几何结构为原子标签到坐标的字典
+    """
+    geometries = []
+    for rows in _iter_orientation_rows(block):
+        geometry = {}
+        for center, atom_num, x, y, z in rows:
+            geometry[_atom_label(atom_num, center)] = (float(x), float(y), float(z))
+        geometries.append(geometry)
+    return geometries
+
+
+def _search_energy(mm: mmap.mmap, start: int, end: int) -> Optional[float]:
+    """
+    在映射文件的一段字节范围中查找能量值
+
+    Args:
+        mm: 映射的文件
+        start: 起始字节偏移
+        end: 结束字节偏移
+
+    Returns:
+        Optional[float]: 提取的能量值，如果未找到则返回None
+    """
+    # 与 extract_energy 相同，先定位子串，正则只从可能命中的位置开始匹配
+    pos = mm.find(b"SCF Done:", start, end)
+    if pos != -1:
+        scf_match = _SCF_RE_BYTES.search(mm, pos, end)
+        if scf_match:
+            return float(scf_match.group(1))
+
+    pos = mm.find(b"Energy=", start, end)
+    if pos != -1:
+        final_match = _ENERGY_RE_BYTES.search(mm, pos, end)
+        if final_match:
+            return float(final_match.group(1))
+
+    return None
+
+
+def _energies_in_ranges(path: str, byte_ranges: List[Tuple[int, int]]) -> List[Optional[float]]:
+    """
+    依次提取多个块的能量值，可在子进程中运行
+
+    Args:
+        path: 文件路径
+        byte_ranges: 各块的 (起始, 结束) 字节偏移
+
+    Returns:
+        List[Optional[float]]: 各块的能量值，未找到的为None
+    """
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return [None] * len(byte_ranges)
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return [_search_energy(mm, start, end) if end > start else None
+                for start, end in byte_ranges]
+    finally:
+        mm.close()
+
+
+def _geometries_in_ranges(path: str, byte_ranges: List[Tuple[int, int]]) -> List[List[Dict]]:
+    """
+    依次提取多个块的几何结构，可在子进程中运行
+
+    Args:
+        path: 文件路径
+        byte_ranges: 各块的 (起始, 结束) 字节偏移
+
+    Returns:
+        List[List[Dict]]: 各块的几何结构列表
+    """
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return [[] for _ in byte_ranges]
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return [_parse_geometries(mm[start:end].decode('utf-8', errors='ignore'))
+                for start, end in byte_ranges]
+    finally:
+        mm.close()
+
+
+@functools.lru_cache(maxsize=128)
+def _analyze_head(path: str, mtime_ns: int, size: int) -> Tuple[bool, bool]:
+    """
+    读取一次文件头，同时完成文件类型检测和IRC计算检测
+
+    结果按 (路径, 修改时间, 文件大小) 缓存，文件变化后自动失效。
+
+    Args:
+        path: 文件绝对路径
+        mtime_ns: 文件修改时间（纳秒）
+        size: 文件大小
+
+    Returns:
+        Tuple[bool, bool]: (是否为量子化学输出文件, 是否为IRC计算)
+    """
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            return False, False
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # 直接在映射的文件头上查找，不读取副本也不解码，两次查找都在首个命中处停止
+    try:
+        end = min(size, DETECT_HEAD_SIZE)
+        detected = _DETECT_RE.search(mm, 0, end) is not None
+        is_irc = mm.find(_IRC_MARKER, 0, end) != -1
+    finally:
+        mm.close()
+    return detected, is_irc
+
+
+class QuantumChemPlugin(Plugin, name="quantum_chem", description="量子化学程序输出文件支持"):
     """量子化学程序输出文件插件"""
     
-    name = "quantum_chem"
-    description = "量子化学程序输出文件支持"
+    # 名称和描述通过类定义关键字参数声明，不占用与槽位同名的类属性
+    __slots__ = (
+        'viewer', 'highlighter', 'separators', 'keyword_types',
+        '_common_keywords', '_error_keywords', '_warning_keywords', '_success_keywords',
+        '_keyword_styles', '_keyword_styles_lower',
+    )
     
     def __init__(self, name: str, description: str):
         """初始化插件"""
@@ -37,6 +294,18 @@ class QuantumChemPlugin(Plugin):
         self._error_keywords = self.keyword_types.get("error", DEFAULT_KEYWORD_TYPES["error"])
         self._warning_keywords = self.keyword_types.get("warning", DEFAULT_KEYWORD_TYPES["warning"])
         self._success_keywords = self.keyword_types.get("success", DEFAULT_KEYWORD_TYPES["success"])
+        
+        # 按 错误 > 警告 > 成功 > 普通关键词 的优先级去重后的样式映射，以及小写关键词到样式的映射，
+        # 只在加载配置时计算一次
+        self._keyword_styles = merge_keyword_styles(
+            ("error", self._error_keywords),
+            ("warning", self._warning_keywords),
+            ("success", self._success_keywords),
+            ("keyword", self._common_keywords),
+        )
+        self._keyword_styles_lower: Dict[str, str] = {}
+        for keyword, style_name in self._keyword_styles.items():
+            self._keyword_styles_lower.setdefault(keyword.lower(), style_name)
     
     # 为了保持向后兼容，提供只读属性
     @property
@@ -55,6 +324,18 @@ class QuantumChemPlugin(Plugin):
     def SUCCESS_KEYWORDS(self):
         return self._success_keywords
     
+    def get_keyword_type(self, keyword: str) -> Optional[str]:
+        """
+        获取关键词所属的类型，不区分大小写
+        
+        Args:
+            keyword: 关键词
+            
+        Returns:
+            Optional[str]: 类型名（error、warning、success 或 keyword），不是预设关键词时返回None
+        """
+        return self._keyword_styles_lower.get(keyword.lower())
+    
     def initialize(self, context: Any) -> None:
         """
         初始化插件
@@ -74,44 +355,36 @@ class QuantumChemPlugin(Plugin):
         if not self.highlighter:
             return
             
-        # 清除现有模式，使用量子化学特定的模式
-        self.highlighter.clear_patterns()
-        
-        # 添加错误关键词高亮
-        for keyword in self.ERROR_KEYWORDS:
-            self.highlighter.add_pattern(
-                keyword,
-                self.highlighter.DEFAULT_STYLES["error"],
-                whole_line=True,
-                case_sensitive=False
-            )
-        
-        # 添加警告关键词高亮
-        for keyword in self.WARNING_KEYWORDS:
-            self.highlighter.add_pattern(
-                keyword,
-                self.highlighter.DEFAULT_STYLES["warning"],
-                whole_line=True,
-                case_sensitive=False
-            )
-        
-        # 添加成功关键词高亮
-        for keyword in self.SUCCESS_KEYWORDS:
-            self.highlighter.add_pattern(
-                keyword,
-                self.highlighter.DEFAULT_STYLES["success"],
-                whole_line=True,
-                case_sensitive=False
-            )
-        
-        # 添加常见关键词高亮
-        for keyword in self.COMMON_KEYWORDS:
-            self.highlighter.add_pattern(
-                keyword,
-                self.highlighter.DEFAULT_STYLES["keyword"],
-                whole_line=False,
-                case_sensitive=False
-            )
+        # 使用量子化学特定的模式替换现有模式，同一关键词只按优先级最高的类型高亮一次，
+        # 所有模式由高亮器合并为一个正则，每行只扫描一遍
+        self.highlighter.set_keyword_patterns(self._keyword_styles)
+    
+    def analyze(self, filename: str, file_stat: Optional[os.stat_result] = None) -> Tuple[bool, str]:
+        """
+        分析文件类型并给出建议的分隔符
+        
+        只打开并读取一次文件头，结果按文件修改时间和大小缓存。
+        
+        Args:
+            filename: 文件路径
+            file_stat: 调用方已获取的文件状态，提供时不再重复stat
+            
+        Returns:
+            Tuple[bool, str]: (是否为量子化学程序输出文件, 建议的分隔符)
+        """
+        try:
+            path = os.path.abspath(filename)
+            if file_stat is None:
+                file_stat = os.stat(path)
+            detected, is_irc = _analyze_head(path, file_stat.st_mtime_ns, file_stat.st_size)
+        except (OSError, ValueError):
+            # 文件无法读取或映射时视为非量子化学文件，使用默认分隔符
+            detected, is_irc = False, False
+        
+        if is_irc:
+            return detected, self.separators.get("irc", DEFAULT_SEPARATORS["irc"])
+        # 默认使用Grad分隔符
+        return detected, self.separators.get("grad", DEFAULT_SEPARATORS["grad"])
     
     def detect_file_type(self, filename: str) -> bool:
         """
@@ -123,37 +396,7 @@ class QuantumChemPlugin(Plugin):
         Returns:
             bool: 是否为量子化学程序输出文件
         """
-        try:
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as file:
-                # 读取前1000行或文件结束
-                lines = []
-                for i, line in enumerate(file):
-                    lines.append(line)
-                    if i >= 1000:
-                        break
-                
-                content = ''.join(lines)
-                
-                # 检查是否包含量子化学软件的特征字符串
-                patterns = [
-                    "Gaussian",
-                    "ORCA",
-                    "GAMESS",
-                    "Molpro",
-                    "Q-Chem",
-                    "NWChem",
-                    "SCF Done",
-                    "Optimization completed",
-                    "Convergence criterion met"
-                ]
-                
-                for pattern in patterns:
-                    if pattern in content:
-                        return True
-                
-            return False
-        except:
-            return False
+        return self.analyze(filename)[0]
     
     def suggest_separator(self, filename: str) -> str:
         """
@@ -165,19 +408,7 @@ class QuantumChemPlugin(Plugin):
         Returns:
             str: 建议的分隔符
         """
-        try:
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read(10000)  # 读取前10000个字符
-                
-                # 检查是否包含IRC计算
-                if "IRC" in content and "--IRC--" in content:
-                    return self.separators.get("irc", DEFAULT_SEPARATORS["irc"])
-                
-                # 默认使用Grad分隔符
-                return self.separators.get("grad", DEFAULT_SEPARATORS["grad"])
-        except:
-            # 出现错误时使用默认分隔符
-            return self.separators.get("grad", DEFAULT_SEPARATORS["grad"])
+        return self.analyze(filename)[1]
     
     def extract_energy(self, block: str) -> float:
         """
@@ -189,18 +420,46 @@ class QuantumChemPlugin(Plugin):
         Returns:
             float: 提取的能量值，如果未找到则返回None
         """
-        # 尝试匹配SCF能量
-        scf_match = re.search(r"SCF Done:.*=\s*([-]?\d+\.\d+)", block)
-        if scf_match:
-            return float(scf_match.group(1))
+        # 先用子串查找排除不含能量信息的块，只对可能命中的模式运行正则
+        if "SCF Done:" in block:
+            # 尝试匹配SCF能量
+            scf_match = _SCF_RE.search(block)
+            if scf_match:
+                return float(scf_match.group(1))
         
-        # 尝试匹配最终能量
-        final_match = re.search(r"Energy=\s*([-]?\d+\.\d+)", block)
-        if final_match:
-            return float(final_match.group(1))
+        if "Energy=" in block:
+            # 尝试匹配最终能量
+            final_match = _ENERGY_RE.search(block)
+            if final_match:
+                return float(final_match.group(1))
         
         return None
     
+    def extract_energy_range(self, path: str, byte_range: Tuple[int, int]) -> Optional[float]:
+        """
+        从文件的一段字节范围中提取能量值
+        
+        与 extract_energy 的结果相同，但直接在映射的文件上查找，
+        不需要先把块读取并解码为字符串。
+        
+        Args:
+            path: 文件路径
+            byte_range: 块的 (起始, 结束) 字节偏移，如解析器的 block_offsets 中的一项
+            
+        Returns:
+            Optional[float]: 提取的能量值，如果未找到则返回None
+        """
+        start, end = byte_range
+        if end <= start:
+            return None
+        
+        with open(path, 'rb') as file:
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return _search_energy(mm, start, end)
+        finally:
+            mm.close()
+    
     def extract_geometries(self, block: str) -> List[Dict]:
         """
         从块中提取分子几何结构
@@ -209,36 +468,92 @@ class QuantumChemPlugin(Plugin):
             block: 文本块内容
             
         Returns:
-            List[Dict]: 提取的几何结构列表，每个几何结构为原子符号和坐标的字典
+            List[Dict]: 提取的几何结构列表，每个几何结构为原子标签到坐标的字典，
+                原子标签为元素符号加中心序号（如 C1、H2），保证同种元素的多个原子不会互相覆盖
+        """
+        return _parse_geometries(block)
+    
+    def extract_geometry_arrays(self, block: str) -> Tuple[List[str], array.array]:
+        """
+        从块中提取分子几何结构，以紧凑的连续数组形式返回整条轨迹
+        
+        原子符号只保存一份，所有帧的坐标按 帧、原子、XYZ 的顺序依次存放在一个
+        双精度数组中，第f帧第i个原子的X坐标位于 (f * 原子数 + i) * 3。
+        与第一帧原子数不同的坐标表不计入轨迹。
+        
+        Args:
+            block: 文本块内容
+            
+        Returns:
+            Tuple[List[str], array.array]: (原子符号列表, 坐标数组)，没有几何结构时均为空
         """
-        geometries = []
+        symbols: List[str] = []
+        coords = array.array('d')
         
-        # 匹配标准坐标块
-        std_orient_matches = re.finditer(
-            r"Standard orientation:.*?-+\n.*?-+\n(.*?)(?:-+|Rotational constants)",
-            block, re.DOTALL
-        )
+        for rows in _iter_orientation_rows(block):
+            if not symbols:
+                symbols = [_atom_symbol(atom_num) for _, atom_num, _, _, _ in rows]
+            elif len(rows) != len(symbols):
+                continue
+            # 整帧坐标文本一次性交给 map(float) 转换并写入数组，不逐个原子创建元组
+            coords.extend(map(float, itertools.chain.from_iterable(row[2:] for row in rows)))
+        
+        return symbols, coords
+    
+    def extract_energies_many(self, path: str,
+                              byte_ranges: List[Tuple[int, int]]) -> List[Optional[float]]:
+        """
+        提取多个块的能量值，块数较多时在多个进程中并行提取
         
-        for match in std_orient_matches:
-            geometry = {}
-            lines = match.group(1).strip().split('\n')
-            for line in lines:
-                parts = line.strip().split()
-                if len(parts) >= 6:  # 应至少包含6列数据
-                    try:
-                        atom_num = int(parts[1])
-                        atom_sym = parts[3]
-                        x = float(parts[3])
-                        y = float(parts[4])
-                        z = float(parts[5])
-                        geometry[atom_sym] = (x, y, z)
-                    except (ValueError, IndexError):
-                        pass
+        Args:
+            path: 文件路径
+            byte_ranges: 各块的 (起始, 结束) 字节偏移，如解析器的 block_offsets
             
-            if geometry:
-                geometries.append(geometry)
+        Returns:
+            List[Optional[float]]: 与 byte_ranges 一一对应的能量值，未找到的为None
+        """
+        return self._map_ranges(_energies_in_ranges, path, byte_ranges)
+    
+    def extract_geometries_many(self, path: str,
+                                byte_ranges: List[Tuple[int, int]]) -> List[List[Dict]]:
+        """
+        提取多个块的几何结构，块数较多时在多个进程中并行提取
+        
+        Args:
+            path: 文件路径
+            byte_ranges: 各块的 (起始, 结束) 字节偏移，如解析器的 block_offsets
+            
+        Returns:
+            List[List[Dict]]: 与 byte_ranges 一一对应的几何结构列表，格式同 extract_geometries
+        """
+        return self._map_ranges(_geometries_in_ranges, path, byte_ranges)
+    
+    def _map_ranges(self, worker, path: str, byte_ranges: List[Tuple[int, int]]) -> list:
+        """
+        将块按CPU核数分段交给进程池处理，并按原顺序合并结果
         
-        return geometries
+        子进程自行映射文件，只传输字节偏移和提取结果。块数较少或进程池不可用时在当前进程中处理。
+        
+        Args:
+            worker: 处理一段块的模块级函数，参数为 (文件路径, 字节偏移列表)
+            path: 文件路径
+            byte_ranges: 各块的 (起始, 结束) 字节偏移
+            
+        Returns:
+            list: 各块的处理结果
+        """
+        byte_ranges = list(byte_ranges)
+        if len(byte_ranges) < PARALLEL_EXTRACT_MIN_BLOCKS:
+            return worker(path, byte_ranges)
+        
+        chunk_size = -(-len(byte_ranges) // (os.cpu_count() or 1))
+        try:
+            pool = get_process_pool()
+            futures = [pool.submit(worker, path, byte_ranges[first:first + chunk_size])
+                       for first in range(0, len(byte_ranges), chunk_size)]
+            return [result for future in futures for result in future.result()]
+        except (OSError, ValueError, concurrent.futures.BrokenExecutor):
+            return worker(path, byte_ranges)
     
     def cleanup(self) -> None:
         """清理插件资源"""
@@ -5,17 +5,68 @@
 """
 
 import curses
-import os
 import sys
-import json
+import time
 from typing import Dict, List, Optional, Tuple, Any, Callable
 from ..core.viewer import LogViewer
+from ..core.highlighter import HighlightPattern
 from ..plugins.quantum_chem import QuantumChemPlugin
+from ..utils.config import load_keywords, save_keywords
 
 
 class CursesUI:
     """基于curses的终端用户界面"""
     
+    # 高亮样式的颜色到颜色对的映射，其他颜色按普通关键词的颜色对显示
+    STYLE_COLOR_PAIRS = {"red": 4, "yellow": 5, "green": 6, "cyan": 7}
+    
+    # 连续处理积压按键的最长时间（秒），超过后先重绘一次，保证长时间输入时画面仍能更新
+    FRAME_INTERVAL = 0.016
+    
+    # 帮助信息，每行一项
+    HELP_TEXT = (
+        "量子化学输出文件命令行查看器 - 帮助",
+        "=============================================",
+        "导航命令:",
+        "  n / 右箭头 - 下一个块",
+        "  p / 左箭头 - 上一个块",
+        "  f - 第一个块",
+        "  l - 最后一个块",
+        "  g - 跳转到指定块 (例如: g10)",
+        "  j / 下箭头 - 向下滚动",
+        "  k / 上箭头 - 向上滚动",
+        "  J / PageDown - 向下翻页",
+        "  K / PageUp - 向上翻页",
+        "",
+        "搜索和过滤:",
+        "  / - 开始搜索",
+        "    + Tab - 关键词补全（循环显示匹配的预设关键词）",
+        "  ? - 开始向后搜索",
+        "    + Tab - 关键词补全（同上）",
+        "  N - 下一个搜索结果",
+        "  P - 上一个搜索结果",
+        "  F - 过滤模式 (只显示包含搜索词的块)",
+        "  O - 切换关键词聚焦 (过滤模式下自动聚焦关键词)",
+        "  + - 增加关键词聚焦偏移量 (关键词位置上移)",
+        "  - - 减少关键词聚焦偏移量 (关键词位置下移)",
+        "  c - 清除过滤",
+        "",
+        "命令模式:",
+        "  :addkw - 添加当前搜索词到预设关键词列表",
+        "           (存储在 ~/.config/logview/keywords.json)",
+        "",
+        "显示选项:",
+        "  v - 切换完整文件视图/分块视图",
+        "  # - 切换行号显示",
+        "  H - 切换关键词高亮",
+        "",
+        "文件操作:",
+        "  s - 保存当前块到文件",
+        "  q - 退出程序",
+        "",
+        "按任意键返回..."
+    )
+    
     # 推荐的常用关键词，只用于首次创建配置文件
     RECOMMENDED_KEYWORDS = [
         "SCF Done", "Excited State   1", "Optimization completed", 
@@ -36,25 +87,66 @@ class CursesUI:
         self.stdscr = None
         self.height = 0
         self.width = 0
+        self.text_height = 0
         self.status_win = None
         self.text_win = None
         self.command_win = None
         self.message_win = None
+        # 消息栏当前是否使用错误背景
+        self._message_error = False
         
         # 命令模式状态
         self.command_mode = False
         self.command_buffer = ""
         
-        # 预设关键词列表（完全从配置文件加载）
-        self.preset_keywords = self._load_keywords()
+        # 预设关键词列表（完全从配置文件加载），首次使用时才读取
+        self._preset_keywords: Optional[List[str]] = None
+        # 与预设关键词一一对应的小写形式，补全和查重时无需每次转换
+        self._keywords_lower: List[str] = []
         
         # Tab补全变量
         self.completion_matches = []
         self.completion_index = 0
         self.completion_prefix = ""
         
-        # 注册命令处理器
+        # 注册命令处理器，并按按键码建立查找表，处理按键时无需转换为字符
         self.commands = self._setup_commands()
+        self._command_keys: Dict[int, Callable] = {ord(k): v for k, v in self.commands.items()}
+        # 方向键等特殊键也放入查找表，每个按键只需一次字典查找
+        self._command_keys.update({
+            curses.KEY_UP: self.scroll_up,
+            curses.KEY_DOWN: self.scroll_down,
+            curses.KEY_LEFT: self.prev_block,  # 左方向键 - 映射到上一个块
+            curses.KEY_RIGHT: self.next_block,  # 右方向键 - 映射到下一个块
+            curses.KEY_PPAGE: self.scroll_up_page,
+            curses.KEY_NPAGE: self.scroll_down_page,
+            curses.KEY_HOME: self.viewer.scroll_to_top,
+            curses.KEY_END: self.viewer.scroll_to_bottom,
+            27: self.clear_filter_or_search,  # Escape键
+        })
+        
+        # 高亮器模式列表中各模式的优先级（注册顺序），模式列表被替换或增加模式后重新生成
+        self._priority_patterns: Optional[List[HighlightPattern]] = None
+        self._pattern_priority: Dict[HighlightPattern, int] = {}
+        
+        # 需要重绘的窗口，以及各窗口上次绘制时的状态，状态未变化的窗口不重绘
+        self._dirty = {'status': True, 'text': True, 'command': False, 'message': True}
+        self._drawn: Dict[str, Any] = {}
+        # 文本窗口上次绘制的分块视图及其顶部行号，用于滚动复用已绘制的行
+        self._last_view: Optional[Tuple] = None
+        self._last_top_line = 0
+        # 文本窗口各行上次写入的显示内容，None表示空行；窗口中是其他内容时整个列表为None
+        self._text_rows: Optional[List[Optional[Tuple]]] = None
+        # 与文本区域高度匹配的默认聚焦偏移量，窗口大小变化时更新
+        self._default_focus_offset = 1
+    
+    @property
+    def preset_keywords(self) -> List[str]:
+        """预设关键词列表，首次访问时从配置文件加载"""
+        if self._preset_keywords is None:
+            self._preset_keywords = self._load_keywords()
+            self._keywords_lower = [keyword.lower() for keyword in self._preset_keywords]
+        return self._preset_keywords
     
     def _load_keywords(self) -> List[str]:
         """
@@ -63,39 +155,7 @@ class CursesUI:
         Returns:
             List[str]: 关键词列表
         """
-        # 用户配置目录和文件
-        config_dir = os.path.expanduser("~/.config/logview")
-        config_file = os.path.join(config_dir, "keywords.json")
-        
-        # 如果配置目录不存在则创建
-        if not os.path.exists(config_dir):
-            try:
-                os.makedirs(config_dir, exist_ok=True)
-            except Exception as e:
-                # 创建目录失败，返回空列表
-                return []
-        
-        # 如果配置文件不存在，创建并写入默认关键词
-        if not os.path.exists(config_file):
-            try:
-                with open(config_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.RECOMMENDED_KEYWORDS, f, indent=2)
-                return list(self.RECOMMENDED_KEYWORDS)
-            except Exception as e:
-                # 创建文件失败，返回空列表
-                return []
-        
-        # 如果配置文件存在，读取其中的关键词
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                keywords = json.load(f)
-                if isinstance(keywords, list):
-                    return [k for k in keywords if isinstance(k, str)]
-                else:
-                    return []
-        except Exception as e:
-            # 读取文件失败，返回空列表
-            return []
+        return load_keywords(default=self.RECOMMENDED_KEYWORDS)
     
     def save_keywords(self) -> bool:
         """
@@ -104,19 +164,7 @@ class CursesUI:
         Returns:
             bool: 是否成功保存
         """
-        try:
-            # 确保配置目录存在
-            config_dir = os.path.expanduser("~/.config/logview")
-            os.makedirs(config_dir, exist_ok=True)
-            
-            config_file = os.path.join(config_dir, "keywords.json")
-            
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.preset_keywords, f, indent=2)
-            
-            return True
-        except Exception as e:
-            return False
+        return save_keywords(self.preset_keywords)
     
     def add_current_search_to_keywords(self) -> bool:
         """
@@ -130,14 +178,16 @@ class CursesUI:
             return False
         
         # 检查关键词是否已存在（不区分大小写）
-        for keyword in self.preset_keywords:
-            if keyword.lower() == search_term.lower():
-                # 关键词已存在，提供更明确的错误信息
-                self.viewer.set_message(f"关键词 '{search_term}' 已存在于预设列表中")
-                return False
+        keywords = self.preset_keywords
+        search_lower = search_term.lower()
+        if search_lower in self._keywords_lower:
+            # 关键词已存在，提供更明确的错误信息
+            self.viewer.set_message(f"关键词 '{search_term}' 已存在于预设列表中")
+            return False
         
         # 添加关键词并保存
-        self.preset_keywords.append(search_term)
+        keywords.append(search_term)
+        self._keywords_lower.append(search_lower)
         success = self.save_keywords()
         
         if success:
@@ -191,24 +241,16 @@ class CursesUI:
         self._setup_curses()
         self._setup_windows()
         
-        # 清空主屏幕并刷新
-        self.stdscr.clear()
-        self.stdscr.refresh()
+        # 清空主屏幕，先于各窗口放入虚拟屏幕，避免覆盖窗口内容
+        self.stdscr.erase()
+        self.stdscr.noutrefresh()
         
         # 初始化所有窗口的背景和内容
         self._init_window_backgrounds()
         
-        # 显示初始内容
+        # 显示初始内容，所有窗口由 display 末尾的 doupdate 一次性输出
         self.display()
         
-        # 确保所有窗口都被刷新
-        self.stdscr.noutrefresh()
-        self.status_win.noutrefresh()
-        self.text_win.noutrefresh()
-        self.command_win.noutrefresh()
-        self.message_win.noutrefresh()
-        curses.doupdate()  # 一次性更新所有窗口
-        
         # 进入主循环
         self._main_loop()
     
@@ -237,12 +279,14 @@ class CursesUI:
     def _setup_windows(self):
         """创建窗口"""
         self.height, self.width = self.stdscr.getmaxyx()
+        # 文本区域的行数，窗口大小变化时随窗口一起重新计算
+        self.text_height = self.height - 3
         
         # 状态栏: 1行，在顶部
         self.status_win = curses.newwin(1, self.width, 0, 0)
         
         # 文本显示区域: 高度-3行，在状态栏下方
-        self.text_win = curses.newwin(self.height - 3, self.width, 1, 0)
+        self.text_win = curses.newwin(self.text_height, self.width, 1, 0)
         
         # 命令栏: 1行，在底部
         self.command_win = curses.newwin(1, self.width, self.height - 2, 0)
@@ -250,40 +294,105 @@ class CursesUI:
         # 消息栏: 1行，在命令栏下方
         self.message_win = curses.newwin(1, self.width, self.height - 1, 0)
         
+        # 窗口背景只在创建时设置一次，消息栏在切换错误状态时才更换背景
+        self.status_win.bkgd(' ', curses.color_pair(1))
+        self.command_win.bkgd(' ', curses.color_pair(3))
+        self.message_win.bkgd(' ', curses.color_pair(3))
+        self._message_error = False
+        
         # 启用按键功能
         self.stdscr.keypad(True)
         self.text_win.keypad(True)
         self.command_win.keypad(True)
         
+        # 允许curses用终端的插入/删除行功能输出滚动，新建的文本窗口需要完整绘制
+        self.text_win.idlok(True)
+        self._last_view = None
+        self._last_top_line = 0
+        # 新建的文本窗口为空，所有行都需要写入
+        self._text_rows = [None] * self.text_height
+        
         # 启用即时输入
         self.stdscr.nodelay(False)
         
         # 计算并更新Viewer的聚焦偏移量，使关键词显示在窗口中间
-        text_height = self.height - 3  # 文本窗口的高度
         # 设置偏移量为文本区域高度的1/3左右，这样关键词会在视图的上部1/3处
-        self.viewer.state.focus_offset = max(1, text_height // 3)
+        self._default_focus_offset = max(1, self.text_height // 3)
+        self.viewer.state.focus_offset = self._default_focus_offset
     
     def _resize_windows(self):
         """处理窗口大小变化"""
-        self.stdscr.clear()
+        # 只擦除主屏幕内容，由 display 末尾的 doupdate 与各窗口一起输出
+        self.stdscr.erase()
+        self.stdscr.noutrefresh()
         self._setup_windows()
+        self.mark_dirty()
         self.display()
     
+    def mark_dirty(self, *windows: str):
+        """
+        标记需要重绘的窗口
+        
+        Args:
+            *windows: 窗口名称（status、text、command、message），不指定时标记全部窗口
+        """
+        for window in windows or self._dirty:
+            self._dirty[window] = True
+    
+    def _window_states(self) -> Dict[str, Any]:
+        """
+        获取决定各窗口显示内容的状态
+        
+        Returns:
+            Dict[str, Any]: 窗口名称到状态元组的映射，状态相同的窗口无需重绘
+        """
+        state = self.viewer.state
+        block_count = len(self.viewer.parser.blocks)
+        actual_index = self.viewer.get_actual_index() if block_count else -1
+        modes = (state.full_view_mode, state.filter_mode, state.highlight_enabled,
+                 state.focus_keyword, state.help_mode)
+        return {
+            'status': (self.width, self.viewer.file_basename, block_count, actual_index,
+                       state.current_block_index, state.current_filtered_index,
+                       len(state.filtered_indices or ()), modes),
+            'text': (self.width, self.height, actual_index, state.top_line,
+                     state.show_line_numbers, state.search_term, modes),
+            'message': (self.width, state.message, state.error),
+        }
+    
     def display(self):
-        """显示当前内容"""
-        self.draw_status_bar()
-        self.draw_text_content()
+        """
+        显示当前内容，只重绘状态发生变化或被标记的窗口
+        
+        各绘制方法使用 erase 和 noutrefresh，不强制重绘整个窗口，也不单独输出到终端。
+        """
+        dirty = self._dirty
+        states = self._window_states()
+        drawn = self._drawn
+        
+        if dirty['status'] or drawn.get('status') != states['status']:
+            self.draw_status_bar()
+        if dirty['text'] or drawn.get('text') != states['text']:
+            self.draw_text_content()
         if self.command_mode:
             self.draw_command_bar()
-        self.draw_message_bar()
+        if dirty['message'] or drawn.get('message') != states['message']:
+            self.draw_message_bar()
+        
+        # 绘制文本时可能修正顶部行号，记录绘制后的状态
+        self._drawn = self._window_states()
+        for window in dirty:
+            dirty[window] = False
+        
+        # 各窗口只更新虚拟屏幕，最后一次性输出与实际屏幕不同的部分
+        curses.doupdate()
     
     def draw_status_bar(self):
         """绘制状态栏"""
-        self.status_win.clear()
-        self.status_win.bkgd(' ', curses.color_pair(1))
+        self.status_win.erase()
         
         # 显示文件名和块信息
-        file_info = f" {os.path.basename(self.viewer.parser.filename) if self.viewer.parser.filename else '无文件'}"
+        file_info = f" {self.viewer.file_basename or '无文件'}"
         
         # 显示当前块信息
         if self.viewer.parser.blocks:
@@ -316,190 +425,259 @@ class CursesUI:
         status_str = status_str[:self.width - 1]
         
         self.status_win.addstr(0, 0, status_str)
-        self.status_win.refresh()
+        self.status_win.noutrefresh()
     
     def draw_text_content(self):
         """绘制文本内容区域"""
-        self.text_win.clear()
+        state = self.viewer.state
+        
+        # 分块视图模式，只取出需要绘制的行；空块只有一个空行，会清空文本区域而不是保留上一块的内容。
+        # 分块视图只重写内容发生变化的行
+        if self.viewer.parser.blocks and not state.help_mode and not state.full_view_mode:
+            self.draw_block_view()
+            return
+        
+        # 其他内容直接擦除整个窗口后绘制，窗口各行的内容不再已知
+        self._last_view = None
+        self._text_rows = None
+        self.text_win.erase()
         
         # 没有数据时的提示
         if not self.viewer.parser.blocks:
             self.text_win.addstr(0, 0, "没有数据可显示 (按 'h' 获取帮助)")
-            self.text_win.refresh()
+            self.text_win.noutrefresh()
             return
         
         # 帮助模式
-        if self.viewer.state.help_mode:
+        if state.help_mode:
             self.draw_help()
             return
         
-        # 获取当前块内容
-        block = self.viewer.get_current_block()
-        if not block:
-            return
-            
         # 完整视图模式
-        if self.viewer.state.full_view_mode:
-            self.draw_full_view()
-            return
-        
-        # 分块视图模式
-        self.draw_block_view(block)
+        self.draw_full_view()
     
-    def draw_block_view(self, content: str):
+    def draw_block_view(self):
         """
         绘制分块视图
         
-        Args:
-            content: 要显示的文本内容
+        每一行先生成描述其显示内容的 (行号位置, 行号文本, 文字段) 元组，与窗口中该行
+        上次写入的内容比较，只重写不同的行。与上次绘制的是同一块且只滚动了不到一屏时，
+        先滚动窗口内容，只需生成新露出的行。只有要绘制的行会从文件中解码，与块的大小无关。
         """
-        # 将内容分割成行
-        lines = content.split('\n')
+        state = self.viewer.state
         
         # 获取可显示的行数
-        visible_height = self.height - 3  # 减去状态栏和命令栏
+        visible_height = self.text_height
         
         # 确保top_line不超过总行数
-        if self.viewer.state.top_line >= len(lines):
-            self.viewer.state.top_line = max(0, len(lines) - 1)
-        
-        # 获取当前视图中应该显示的行
-        start_line = self.viewer.state.top_line
-        end_line = min(start_line + visible_height, len(lines))
-        display_lines = lines[start_line:end_line]
+        line_count = self.viewer.get_current_line_count()
+        if state.top_line >= line_count:
+            state.top_line = max(0, line_count - 1)
+        start_line = state.top_line
+        
+        # 显示内容除顶部行号外都相同时，窗口中已有的行可以直接滚动复用
+        view = (self.viewer.get_actual_index(), state.show_line_numbers,
+                state.highlight_enabled, state.search_term)
+        delta = start_line - self._last_top_line if view == self._last_view else 0
+        self._last_view = view
+        self._last_top_line = start_line
+        
+        text_rows = self._text_rows
+        if text_rows is None:
+            # 窗口中是帮助等其他内容，先擦除
+            self.text_win.erase()
+            text_rows = self._text_rows = [None] * visible_height
+            rows = range(visible_height)
+        elif 0 < abs(delta) < visible_height:
+            # 只在滚动时允许窗口滚动，避免在右下角写字符时整个窗口上移
+            self.text_win.scrollok(True)
+            self.text_win.scroll(delta)
+            self.text_win.scrollok(False)
+            if delta > 0:
+                text_rows[:] = text_rows[delta:] + [None] * delta
+                rows = range(visible_height - delta, visible_height)
+            else:
+                text_rows[:] = [None] * -delta + text_rows[:delta]
+                rows = range(-delta)
+        else:
+            rows = range(visible_height)
         
-        # 绘制行号和内容
-        for i, line in enumerate(display_lines):
-            # 当前行的实际行号
-            actual_line_num = start_line + i
-            
-            # 显示行号
-            if self.viewer.state.show_line_numbers:
-                line_num_str = f"{actual_line_num + 1:4} "
-                self.text_win.addstr(i, 0, line_num_str)
-                line_start_pos = 5
+        # 生成各行的显示内容，超出块末尾的行为空行
+        lines = self.viewer.get_current_line_range(start_line + rows.start, start_line + rows.stop)
+        for i in rows:
+            if i - rows.start < len(lines):
+                row = self._block_row(start_line + i, lines[i - rows.start])
             else:
-                line_start_pos = 0
+                row = None
+            if row == text_rows[i]:
+                continue
+            text_rows[i] = row
             
-            # 处理行的宽度
-            line_width = self.width - line_start_pos
-            if len(line) > line_width:
-                line = line[:line_width - 3] + "..."
-            
-            # 绘制行内容
             try:
-                self.text_win.addstr(i, line_start_pos, line)
-                
-                # 高亮关键词
-                if self.viewer.state.highlight_enabled:
-                    self.highlight_line(i, line, line_start_pos)
-                
-                # 高亮搜索词
-                if self.viewer.state.search_term:
-                    self.highlight_search(i, line, line_start_pos)
+                self._draw_text_row(i, row)
             except curses.error:
                 # 忽略超出界限的绘制错误
                 pass
         
-        self.text_win.refresh()
+        self.text_win.noutrefresh()
+    
+    def _block_row(self, actual_line_num: int, line: str) -> Tuple[int, str, Tuple[Tuple[str, int], ...]]:
+        """
+        生成分块视图中一行的显示内容
+        
+        Args:
+            actual_line_num: 该行在块中的行号
+            line: 行文本内容
+            
+        Returns:
+            Tuple[int, str, Tuple[Tuple[str, int], ...]]: (文本开始位置, 行号文本, 文字段)
+        """
+        # 显示行号
+        if self.viewer.state.show_line_numbers:
+            line_num_str = f"{actual_line_num + 1:4} "
+            line_start_pos = 5
+        else:
+            line_num_str = ""
+            line_start_pos = 0
+        
+        # 处理行的宽度
+        line_width = self.width - line_start_pos
+        if len(line) > line_width:
+            line = line[:line_width - 3] + "..."
+        
+        return line_start_pos, line_num_str, self.line_runs(line)
+    
+    def _draw_text_row(self, line_num: int, row: Optional[Tuple[int, str, Tuple[Tuple[str, int], ...]]]):
+        """
+        清除文本窗口中的一行并写入新的内容
+        
+        Args:
+            line_num: 屏幕上的行号
+            row: _block_row 生成的显示内容，为None时只清除该行
+        """
+        self.text_win.move(line_num, 0)
+        self.text_win.clrtoeol()
+        if row is None:
+            return
+        
+        line_start_pos, line_num_str, runs = row
+        if line_num_str:
+            self.text_win.addstr(line_num_str)
+        # 第一段定位到文本开始位置，之后的各段接着光标位置写入，不需要按显示宽度计算列号
+        self.text_win.move(line_num, line_start_pos)
+        for text, attr in runs:
+            self.text_win.addstr(text, attr)
     
     def draw_full_view(self):
         """绘制完整文件视图"""
         # 如果需要完整实现，可以考虑将所有块连接起来显示
         self.text_win.addstr(0, 0, "完整文件视图模式 (尚未完全实现)")
         self.text_win.addstr(1, 0, "请使用分块视图模式进行查看")
-        self.text_win.refresh()
+        self.text_win.noutrefresh()
+    
+    def _pattern_priorities(self) -> Dict[HighlightPattern, int]:
+        """
+        获取高亮器中各模式的优先级
+        
+        Returns:
+            Dict[HighlightPattern, int]: 模式到其注册顺序的映射，数值越小越优先
+        """
+        patterns = self.viewer.highlighter.patterns
+        if self._priority_patterns is not patterns or len(self._pattern_priority) != len(patterns):
+            self._priority_patterns = patterns
+            self._pattern_priority = {pattern: i for i, pattern in enumerate(patterns)}
+        return self._pattern_priority
     
-    def highlight_line(self, line_num: int, line_text: str, start_pos: int):
+    def line_runs(self, line_text: str) -> Tuple[Tuple[str, int], ...]:
         """
-        高亮一行文本中的关键词
+        将一行文本按最终的显示属性分段
+        
+        先确定每个字符的显示属性（搜索词优先于关键词），再把属性相同的连续文字
+        合为一段，绘制时每段只写一次。
         
         Args:
-            line_num: 屏幕上的行号
             line_text: 行文本内容
-            start_pos: 开始绘制的位置
+            
+        Returns:
+            Tuple[Tuple[str, int], ...]: 依次排列的 (文字, 显示属性)，空行为空元组
         """
-        line_text_lower = line_text.lower()
-        
-        # 检查各种关键词类型并高亮
-        # 错误关键词
-        for keyword in ["error", "failed", "错误", "失败"]:
-            if keyword.lower() in line_text_lower:
-                try:
-                    self.text_win.addstr(line_num, start_pos, line_text, curses.color_pair(4))
-                    return  # 整行高亮后返回
-                except curses.error:
-                    pass
-        
-        # 警告关键词
-        for keyword in ["warning", "警告"]:
-            if keyword.lower() in line_text_lower:
-                try:
-                    self.text_win.addstr(line_num, start_pos, line_text, curses.color_pair(5))
-                    return  # 整行高亮后返回
-                except curses.error:
-                    pass
-        
-        # 成功关键词
-        for keyword in ["scf done", "optimization completed", "converged"]:
-            if keyword.lower() in line_text_lower:
-                try:
-                    self.text_win.addstr(line_num, start_pos, line_text, curses.color_pair(6))
-                    return  # 整行高亮后返回
-                except curses.error:
-                    pass
-        
-        # 其他关键词
-        for keyword in self.viewer.highlighter.COMMON_KEYWORDS:
-            keyword_lower = keyword.lower()
-            if keyword_lower in line_text_lower:
-                start_idx = line_text_lower.find(keyword_lower)
-                end_idx = start_idx + len(keyword)
-                try:
-                    # 高亮前面部分
-                    self.text_win.addstr(line_num, start_pos, line_text[:start_idx])
-                    # 高亮关键词
-                    self.text_win.addstr(line_num, start_pos + start_idx, line_text[start_idx:end_idx], curses.color_pair(7))
-                    # 高亮后面部分
-                    self.text_win.addstr(line_num, start_pos + end_idx, line_text[end_idx:])
-                except curses.error:
-                    pass
-                return  # 只处理第一个匹配的关键词
+        # 空行不可能包含关键词或搜索词，不做高亮扫描
+        if not line_text:
+            return ()
+        
+        state = self.viewer.state
+        keyword = self.highlight_line(line_text) if state.highlight_enabled else None
+        search_spans = self.highlight_search(line_text) if state.search_term else []
+        
+        if keyword is None and not search_spans:
+            return ((line_text, 0),)
+        
+        def plain_runs(begin: int, end: int):
+            """未被搜索词覆盖的一段文本按关键词范围拆分"""
+            if keyword is None:
+                return [(begin, end, 0)]
+            key_start, key_end, attr = keyword
+            return [(begin, min(end, key_start), 0),
+                    (max(begin, key_start), min(end, key_end), attr),
+                    (max(begin, key_end), end, 0)]
+        
+        runs = []
+        pos = 0
+        search_attr = curses.color_pair(2)
+        for span_start, span_end in search_spans:
+            runs.extend(plain_runs(pos, span_start))
+            runs.append((span_start, span_end, search_attr))
+            pos = span_end
+        runs.extend(plain_runs(pos, len(line_text)))
+        
+        return tuple((line_text[begin:end], attr) for begin, end, attr in runs if begin < end)
     
-    def highlight_search(self, line_num: int, line_text: str, start_pos: int):
+    def highlight_line(self, line_text: str) -> Optional[Tuple[int, int, int]]:
         """
-        高亮搜索词
+        查找一行文本中需要高亮的关键词
+        
+        所有关键词的出现位置由高亮器一次扫描找出，只高亮其中优先级最高的模式的首次出现：
+        整行高亮的模式（错误、警告、成功关键词）高亮整行，普通关键词只高亮关键词本身。
         
         Args:
-            line_num: 屏幕上的行号
             line_text: 行文本内容
-            start_pos: 开始绘制的位置
+            
+        Returns:
+            Optional[Tuple[int, int, int]]: 高亮范围的 (起始, 结束, 显示属性)，整行高亮时范围为整行；
+                没有关键词时返回None
         """
-        if not self.viewer.state.search_term:
-            return
+        matches = self.viewer.highlighter.find_all_matches(line_text)
+        if not matches:
+            return None
+        
+        # 优先级最高的模式中最先出现的一个
+        priorities = self._pattern_priorities()
+        start_idx, end_idx, pattern = min(matches, key=lambda match: priorities[match[2]])
+        attr = curses.color_pair(self.STYLE_COLOR_PAIRS.get(pattern.style.get("color"), 7))
+        if pattern.whole_line:
+            return 0, len(line_text), attr
+        return start_idx, end_idx, attr
+    
+    def highlight_search(self, line_text: str) -> List[Tuple[int, int]]:
+        """
+        查找一行文本中搜索词出现的位置
+        
+        Args:
+            line_text: 行文本内容
             
-        term_lower = self.viewer.state.search_term.lower()
-        line_lower = line_text.lower()
-        
-        # 找到所有匹配项
-        start_idx = 0
-        while start_idx < len(line_lower):
-            idx = line_lower.find(term_lower, start_idx)
-            if idx == -1:
-                break
-                
-            end_idx = idx + len(self.viewer.state.search_term)
-            try:
-                self.text_win.addstr(line_num, start_pos + idx, line_text[idx:end_idx], curses.color_pair(2))
-            except curses.error:
-                pass
-                
-            start_idx = end_idx
+        Returns:
+            List[Tuple[int, int]]: 各匹配项的 (起始, 结束)，按位置排序且互不重叠
+        """
+        # 与搜索导航共用查看器中预编译的正则，不区分大小写的匹配由正则完成
+        regex = self.viewer.get_search_regex()
+        if regex is None:
+            return []
+        
+        return [match.span() for match in regex.finditer(line_text)]
     
     def draw_command_bar(self):
         """绘制命令栏"""
-        self.command_win.clear()
-        self.command_win.bkgd(' ', curses.color_pair(3))
+        self.command_win.erase()
         
         try:
             # 显示命令缓冲区
@@ -530,16 +708,15 @@ class CursesUI:
             # 忽略绘制错误
             pass
             
-        self.command_win.refresh()
+        self.command_win.noutrefresh()
     
     def draw_message_bar(self):
         """绘制消息栏"""
-        self.message_win.clear()
+        self.message_win.erase()
         
-        if self.viewer.state.error:
-            self.message_win.bkgd(' ', curses.color_pair(8))
-        else:
-            self.message_win.bkgd(' ', curses.color_pair(3))
+        if self.viewer.state.error != self._message_error:
+            self._message_error = self.viewer.state.error
+            self.message_win.bkgd(' ', curses.color_pair(8 if self._message_error else 3))
         
         # 确保消息不超过窗口宽度
         message = self.viewer.state.message
@@ -547,55 +724,14 @@ class CursesUI:
             message = message[:self.width - 4] + "..."
             
         self.message_win.addstr(0, 0, message)
-        self.message_win.refresh()
+        self.message_win.noutrefresh()
     
     def draw_help(self):
         """绘制帮助信息"""
-        help_text = [
-            "量子化学输出文件命令行查看器 - 帮助",
-            "=============================================",
-            "导航命令:",
-            "  n / 右箭头 - 下一个块",
-            "  p / 左箭头 - 上一个块",
-            "  f - 第一个块",
-            "  l - 最后一个块",
-            "  g - 跳转到指定块 (例如: g10)",
-            "  j / 下箭头 - 向下滚动",
-            "  k / 上箭头 - 向上滚动",
-            "  J / PageDown - 向下翻页",
-            "  K / PageUp - 向上翻页",
-            "",
-            "搜索和过滤:",
-            "  / - 开始搜索",
-            "    + Tab - 关键词补全（循环显示匹配的预设关键词）",
-            "  ? - 开始向后搜索",
-            "    + Tab - 关键词补全（同上）",
-            "  N - 下一个搜索结果",
-            "  P - 上一个搜索结果",
-            "  F - 过滤模式 (只显示包含搜索词的块)",
-            "  O - 切换关键词聚焦 (过滤模式下自动聚焦关键词)",
-            "  + - 增加关键词聚焦偏移量 (关键词位置上移)",
-            "  - - 减少关键词聚焦偏移量 (关键词位置下移)",
-            "  c - 清除过滤",
-            "",
-            "命令模式:",
-            "  :addkw - 添加当前搜索词到预设关键词列表",
-            "           (存储在 ~/.config/logview/keywords.json)",
-            "",
-            "显示选项:",
-            "  v - 切换完整文件视图/分块视图",
-            "  # - 切换行号显示",
-            "  H - 切换关键词高亮",
-            "",
-            "文件操作:",
-            "  s - 保存当前块到文件",
-            "  q - 退出程序",
-            "",
-            "按任意键返回..."
-        ]
+        help_text = self.HELP_TEXT
         
         # 获取可显示的行数
-        visible_height = self.height - 3
+        visible_height = self.text_height
         
         # 确保top_line不超过帮助文本的总行数
         if self.viewer.state.top_line >= len(help_text):
@@ -613,16 +749,23 @@ class CursesUI:
             except curses.error:
                 pass
         
-        self.text_win.refresh()
+        self.text_win.noutrefresh()
     
     def _process_command_input(self):
         """处理命令输入"""
         command_complete = False
         curses.curs_set(1)  # 显示光标
         
+        # 读取连续输入的字符时已取出、尚未处理的按键
+        pending_key = -1
+        
         while not command_complete:
-            self.draw_command_bar()
-            key = self.command_win.getch()
+            if pending_key == -1:
+                self.draw_command_bar()
+                curses.doupdate()
+                key = self.command_win.getch()
+            else:
+                key, pending_key = pending_key, -1
             
             if key == ord('\n'):  # Enter键
                 command_complete = True
@@ -648,7 +791,19 @@ class CursesUI:
                 if self.command_buffer.startswith('/') or self.command_buffer.startswith('?'):
                     self._handle_tab_completion()
             elif 32 <= key <= 126:  # 可打印字符
-                self.command_buffer += chr(key)
+                # 粘贴或快速输入时一次取出所有已到达的可打印字符，之后只重绘一次
+                chars = [chr(key)]
+                self.command_win.nodelay(True)
+                try:
+                    key = self.command_win.getch()
+                    while 32 <= key <= 126:
+                        chars.append(chr(key))
+                        key = self.command_win.getch()
+                finally:
+                    self.command_win.nodelay(False)
+                pending_key = key
+                
+                self.command_buffer += "".join(chars)
                 # 清除之前的补全结果
                 self.completion_matches = []
                 self.completion_index = 0
@@ -700,13 +855,14 @@ class CursesUI:
         prefix_lower = prefix.lower()
         
         # 查找所有匹配的关键词
-        matches = [keyword for keyword in self.preset_keywords 
-                  if keyword.lower().startswith(prefix_lower)]
+        keywords = tuple(zip(self.preset_keywords, self._keywords_lower))
+        matches = [keyword for keyword, keyword_lower in keywords
+                   if keyword_lower.startswith(prefix_lower)]
         
         # 如果没有严格前缀匹配，尝试包含匹配
         if not matches:
-            matches = [keyword for keyword in self.preset_keywords 
-                      if prefix_lower in keyword.lower()]
+            matches = [keyword for keyword, keyword_lower in keywords
+                       if prefix_lower in keyword_lower]
         
         return matches
     
@@ -736,10 +892,7 @@ class CursesUI:
                 self.viewer.set_search_term(search_term)
                 self.viewer.set_message(f"向后搜索: {search_term}")
                 # 跳转到最后一个匹配项
-                block = self.viewer.get_current_block()
-                if block:
-                    lines = block.split('\n')
-                    self.viewer.state.top_line = len(lines) - 1
+                self.viewer.scroll_to_bottom()
                 self.viewer.search_prev()
             else:
                 self.viewer.set_message("请输入搜索关键词", True)
@@ -782,66 +935,77 @@ class CursesUI:
         while True:
             key = self.stdscr.getch()
             
-            if key == curses.KEY_RESIZE:
-                self._resize_windows()
-            elif key == ord(':'):  # 进入命令模式
-                self.command_mode = True
-                self.command_buffer = ":"
-                self.draw_command_bar()
-                self._process_command_input()
-            elif self.viewer.state.help_mode:  # 在帮助模式下，任意键返回
-                if key == ord('j'):  # 在帮助模式下仍然允许j键向下滚动
-                    self.viewer.scroll_down()
-                    self.display()
-                elif key == ord('k'):  # 允许k键向上滚动
-                    self.viewer.scroll_up()
-                    self.display()
-                elif key == ord('J'):  # 允许J键翻页
-                    self.viewer.page_down(self.height - 3)
-                    self.display()
-                elif key == ord('K'):  # 允许K键翻页
-                    self.viewer.page_up(self.height - 3)
-                    self.display()
-                else:
-                    self.viewer.toggle_help_mode()  # 其他键退出帮助模式
-                    self.display()
-            elif 0 < key < 256 and chr(key) in self.commands:  # 执行快捷键命令
-                self.commands[chr(key)]()
-                self.display()
-            elif key == curses.KEY_UP:  # 上方向键
-                self.viewer.scroll_up()
-                self.display()
-            elif key == curses.KEY_DOWN:  # 下方向键
+            # 按住按键时终端中会积压多个按键，全部处理完后只重绘一次
+            self.stdscr.nodelay(True)
+            try:
+                deadline = time.monotonic() + self.FRAME_INTERVAL
+                while key != -1:
+                    key = self._handle_queued_keys(key)
+                    if key != -1 and time.monotonic() >= deadline:
+                        # 按键源源不断时每帧至少重绘一次
+                        self.display()
+                        deadline = time.monotonic() + self.FRAME_INTERVAL
+            finally:
+                self.stdscr.nodelay(False)
+            
+            self.display()
+    
+    def _handle_queued_keys(self, key: int) -> int:
+        """
+        处理一个按键，连续的同向滚动键合并为一次滚动
+        
+        Args:
+            key: 按键码
+            
+        Returns:
+            int: 下一个待处理的按键码，没有积压的按键时为-1
+        """
+        if key in (ord('j'), ord('k')) or (
+                key in (curses.KEY_DOWN, curses.KEY_UP) and not self.viewer.state.help_mode):
+            count = 1
+            next_key = self.stdscr.getch()
+            while next_key == key:
+                count += 1
+                next_key = self.stdscr.getch()
+            # 连续滚动n次与一次滚动n行的结果相同
+            if key in (ord('j'), curses.KEY_DOWN):
+                self.viewer.scroll_down(count)
+            else:
+                self.viewer.scroll_up(count)
+            return next_key
+        
+        self._handle_key(key)
+        return self.stdscr.getch()
+    
+    def _handle_key(self, key: int):
+        """
+        处理一个按键，重绘由主循环在按键处理完后统一进行
+        
+        Args:
+            key: 按键码
+        """
+        command = self._command_keys.get(key)
+        
+        if key == curses.KEY_RESIZE:
+            self._resize_windows()
+        elif key == ord(':'):  # 进入命令模式
+            self.command_mode = True
+            self.command_buffer = ":"
+            self.draw_command_bar()
+            self._process_command_input()
+        elif self.viewer.state.help_mode:  # 在帮助模式下，任意键返回
+            if key == ord('j'):  # 在帮助模式下仍然允许j键向下滚动
                 self.viewer.scroll_down()
-                self.display()
-            elif key == curses.KEY_LEFT:  # 左方向键 - 映射到上一个块
-                self.prev_block()
-                self.display()
-            elif key == curses.KEY_RIGHT:  # 右方向键 - 映射到下一个块
-                self.next_block()
-                self.display()
-            elif key == curses.KEY_NPAGE:  # Page Down
-                self.viewer.page_down(self.height - 3)
-                self.display()
-            elif key == curses.KEY_PPAGE:  # Page Up
-                self.viewer.page_up(self.height - 3)
-                self.display()
-            elif key == curses.KEY_HOME:  # Home
-                self.viewer.scroll_to_top()
-                self.display()
-            elif key == curses.KEY_END:  # End
-                self.viewer.scroll_to_bottom()
-                self.display()
-            elif key == 27:  # Escape键
-                # 如果在过滤模式下，清除过滤
-                if self.viewer.state.filter_mode:
-                    self.viewer.clear_filter()
-                    self.display()
-                # 如果有搜索词，清除搜索
-                elif self.viewer.state.search_term:
-                    self.viewer.set_search_term("")
-                    self.viewer.set_message("已清除搜索")
-                    self.display()
+            elif key == ord('k'):  # 允许k键向上滚动
+                self.viewer.scroll_up()
+            elif key == ord('J'):  # 允许J键翻页
+                self.viewer.page_down(self.text_height)
+            elif key == ord('K'):  # 允许K键翻页
+                self.viewer.page_up(self.text_height)
+            else:
+                self.viewer.toggle_help_mode()  # 其他键退出帮助模式
+        elif command is not None:  # 执行快捷键命令
+            command()
     
     # 命令处理函数
     def quit(self):
@@ -926,6 +1090,16 @@ class CursesUI:
         self.draw_command_bar()
         self._process_command_input()
     
+    def clear_filter_or_search(self):
+        """清除过滤，不在过滤模式时清除搜索"""
+        # 如果在过滤模式下，清除过滤
+        if self.viewer.state.filter_mode:
+            self.viewer.clear_filter()
+        # 如果有搜索词，清除搜索
+        elif self.viewer.state.search_term:
+            self.viewer.set_search_term("")
+            self.viewer.set_message("已清除搜索")
+    
     def scroll_up(self):
         """向上滚动"""
         self.viewer.scroll_up()
@@ -936,11 +1110,11 @@ class CursesUI:
     
     def scroll_up_page(self):
         """向上翻页"""
-        self.viewer.page_up(self.height - 3)
+        self.viewer.page_up(self.text_height)
     
     def scroll_down_page(self):
         """向下翻页"""
-        self.viewer.page_down(self.height - 3)
+        self.viewer.page_down(self.text_height)
     
     def toggle_full_view(self):
         """切换完整文件视图"""
@@ -968,8 +1142,7 @@ class CursesUI:
         # 如果过滤成功且关键词聚焦未启用，自动启用关键词聚焦
         if not self.viewer.state.focus_keyword:
             # 确保偏移量与当前窗口高度匹配
-            text_height = self.height - 3
-            self.viewer.state.focus_offset = max(1, text_height // 3)
+            self.viewer.state.focus_offset = self._default_focus_offset
             self.viewer.toggle_keyword_focus()
             self.viewer.set_message("已启用过滤模式和关键词聚焦")
     
@@ -981,8 +1154,7 @@ class CursesUI:
     def toggle_keyword_focus(self):
         """切换关键词聚焦"""
         # 确保偏移量与当前窗口高度匹配
-        text_height = self.height - 3
-        self.viewer.state.focus_offset = max(1, text_height // 3)
+        self.viewer.state.focus_offset = self._default_focus_offset
         self.viewer.toggle_keyword_focus()
     
     def increase_focus_offset(self):
@@ -994,19 +1166,11 @@ class CursesUI:
         self.viewer.decrease_focus_offset()
     
     def _init_window_backgrounds(self):
-        """初始化所有窗口的背景颜色"""
-        # 设置状态栏背景
-        self.status_win.bkgd(' ', curses.color_pair(1))
-        self.status_win.refresh()
-        
-        # 设置命令栏背景
-        self.command_win.bkgd(' ', curses.color_pair(3))
-        self.command_win.refresh()
-        
-        # 设置消息栏背景
-        self.message_win.bkgd(' ', curses.color_pair(3))
-        self.message_win.refresh()
+        """显示所有窗口的初始背景，背景颜色已在创建窗口时设置，由之后的 doupdate 统一输出"""
+        self.status_win.noutrefresh()
+        self.command_win.noutrefresh()
+        self.message_win.noutrefresh()
         
         # 清空文本区域
-        self.text_win.clear()
-        self.text_win.refresh() 
\ No newline at end of file
+        self.text_win.erase()
+        self.text_win.noutrefresh()
@@ -0,0 +1,152 @@
+"""
+块索引缓存实用工具
+
+将解析得到的块偏移表保存到磁盘，文件和分隔符未变化时再次打开可跳过解析。
+"""
+
+import os
+import pickle
+import hashlib
+from typing import List, Optional, Tuple
+
+
+# 默认缓存目录
+CACHE_DIR = os.path.expanduser("~/.cache/logview")
+
+# 小于该大小的文件解析很快，不写入缓存
+INDEX_CACHE_MIN_SIZE = 1024 * 1024
+
+# 缓存目录中最多保留的索引文件数，超出时删除最久未使用的索引
+INDEX_CACHE_MAX_FILES = 64
+
+
+def _index_path(filename: str) -> str:
+    """
+    获取文件对应的索引缓存路径
+
+    Args:
+        filename: 日志文件路径
+
+    Returns:
+        str: 缓存文件路径
+    """
+    digest = hashlib.sha1(os.path.abspath(filename).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.idx")
+
+
+def _write_pickle(path: str, data: object) -> None:
+    """
+    原子地写入缓存文件：先写入临时文件并同步到磁盘，再替换目标文件
+
+    临时文件名带进程号，多个查看器同时写同一个索引时互不覆盖临时文件。
+
+    Args:
+        path: 缓存文件路径
+        data: 要写入的数据
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _evict_old_indexes(keep: int = INDEX_CACHE_MAX_FILES) -> None:
+    """
+    删除超出数量上限的索引文件，按修改时间先删除最久未使用的
+
+    Args:
+        keep: 保留的索引文件数
+    """
+    try:
+        entries = [entry for entry in os.scandir(CACHE_DIR)
+                   if entry.name.endswith(".idx") and entry.is_file()]
+    except OSError:
+        return
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[:len(entries) - keep]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def load_block_index(filename: str, mtime_ns: int, size: int,
+                     separator: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    读取块偏移表缓存
+
+    Args:
+        filename: 日志文件路径
+        mtime_ns: 文件修改时间（纳秒）
+        size: 文件大小
+        separator: 解析使用的分隔符
+
+    Returns:
+        Optional[List[Tuple[int, int]]]: 缓存的块偏移表，缓存不存在或已失效时返回None
+    """
+    if size < INDEX_CACHE_MIN_SIZE:
+        return None
+
+    path = _index_path(filename)
+    try:
+        with open(path, 'rb') as f:
+            index = pickle.load(f)
+    except Exception:
+        return None
+
+    if (not isinstance(index, dict)
+            or index.get("mtime_ns") != mtime_ns
+            or index.get("size") != size
+            or index.get("separator") != separator):
+        return None
+
+    # 更新修改时间，清理缓存时按最近使用的时间保留
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return index.get("block_offsets")
+
+
+def save_block_index(filename: str, mtime_ns: int, size: int, separator: str,
+                     block_offsets: List[Tuple[int, int]]) -> bool:
+    """
+    保存块偏移表缓存
+
+    Args:
+        filename: 日志文件路径
+        mtime_ns: 文件修改时间（纳秒）
+        size: 文件大小
+        separator: 解析使用的分隔符
+        block_offsets: 块偏移表
+
+    Returns:
+        bool: 是否成功保存
+    """
+    if size < INDEX_CACHE_MIN_SIZE:
+        return False
+
+    index = {
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "separator": separator,
+        "block_offsets": block_offsets,
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_pickle(_index_path(filename), index)
+    except Exception:
+        return False
+    _evict_old_indexes()
+    return True
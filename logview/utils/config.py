@@ -6,7 +6,13 @@
 
 import os
 import json
-from typing import Dict, List, Any, Optional
+import functools
+import logging
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Mapping, Sequence
+
+# 读写失败时可能正处于curses界面中，不能直接print，只记录日志由调用方通过返回值处理
+logger = logging.getLogger(__name__)
 
 
 # 默认配置目录
@@ -17,55 +23,67 @@ KEYWORDS_FILE = os.path.join(CONFIG_DIR, "keywords.json")
 SEPARATORS_FILE = os.path.join(CONFIG_DIR, "separators.json")
 KEYWORD_TYPES_FILE = os.path.join(CONFIG_DIR, "keyword_types.json")
 
-# 默认分隔符
-DEFAULT_SEPARATORS = {
+# 默认分隔符，只读映射，读取配置失败时直接共享该对象
+DEFAULT_SEPARATORS: Mapping[str, str] = MappingProxyType({
     "grad": "GradGradGradGradGradGradGradGradGradGradGradGradGradGradGradGradGradGrad",
     "irc": "IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC-IRC",
     "custom": ""
-}
+})
 
-# 默认关键词类型
-DEFAULT_KEYWORD_TYPES = {
-    "common": [
+# 默认关键词类型，只读映射，各类型的关键词为元组
+DEFAULT_KEYWORD_TYPES: Mapping[str, Sequence[str]] = MappingProxyType({
+    "common": (
         "SCF Done", "Excited State   1", "Optimization completed", "normal coordinates",
         "Orbital symmetries", "Mulliken charges", "APT charges:", "Converged?", 
         "Standard orientation", "Input orientation", "Frequency", "Failed", 
         "dipole moments", "Point Number:"
-    ],
-    "error": ["Error", "Failed", "错误", "失败"],
-    "warning": ["Warning", "警告"],
-    "success": ["SCF Done", "Optimization completed", "Converged"]
-}
+    ),
+    "error": ("Error", "Failed", "错误", "失败"),
+    "warning": ("Warning", "警告"),
+    "success": ("SCF Done", "Optimization completed", "Converged")
+})
 
 
 def ensure_config_dir():
     """确保配置目录存在"""
-    if not os.path.exists(CONFIG_DIR):
-        try:
-            os.makedirs(CONFIG_DIR, exist_ok=True)
-            return True
-        except Exception as e:
-            print(f"创建配置目录失败: {e}")
-            return False
-    return True
+    try:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        return True
+    except Exception as e:
+        logger.debug("创建配置目录失败: %s", e)
+        return False
 
 
-def load_keywords() -> List[str]:
+def _write_json(path: str, data: Any) -> None:
+    """
+    原子地写入JSON配置文件
+    
+    先完整写入同目录下的临时文件再替换目标文件，读取方只会看到旧文件或新文件，
+    写入中途中断也不会留下不完整的配置。
+    
+    Args:
+        path: 配置文件路径
+        data: 要写入的数据
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def load_keywords(default: Optional[Sequence[str]] = None) -> List[str]:
     """
     加载用户自定义关键词列表
     
+    Args:
+        default: 配置文件不存在时写入配置文件并返回的默认关键词，为None时返回空列表
+    
     Returns:
         List[str]: 关键词列表
     """
-    # 确保配置目录存在
-    if not ensure_config_dir():
-        return []
-    
-    # 如果配置文件不存在，返回空列表
-    if not os.path.exists(KEYWORDS_FILE):
-        return []
-    
-    # 读取配置文件
+    # 读取配置文件，文件不存在时写入默认关键词
     try:
         with open(KEYWORDS_FILE, 'r', encoding='utf-8') as f:
             keywords = json.load(f)
@@ -73,8 +91,13 @@ def load_keywords() -> List[str]:
                 return [k for k in keywords if isinstance(k, str)]
             else:
                 return []
+    except FileNotFoundError:
+        if default is None:
+            return []
+        save_keywords(list(default))
+        return list(default)
     except Exception as e:
-        print(f"读取关键词配置失败: {e}")
+        logger.debug("读取关键词配置失败: %s", e)
         return []
 
 
@@ -94,41 +117,75 @@ def save_keywords(keywords: List[str]) -> bool:
     
     # 保存配置文件
     try:
-        with open(KEYWORDS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(keywords, f, indent=2)
+        _write_json(KEYWORDS_FILE, keywords)
         return True
     except Exception as e:
-        print(f"保存关键词配置失败: {e}")
+        logger.debug("保存关键词配置失败: %s", e)
         return False
 
 
+def _config_mtime(path: str) -> Optional[int]:
+    """
+    获取配置文件的修改时间，用作读取缓存的键
+    
+    Args:
+        path: 配置文件路径
+        
+    Returns:
+        Optional[int]: 修改时间（纳秒），文件不存在时返回None
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
 def load_keyword_types() -> Dict[str, List[str]]:
     """
     加载关键词类型配置
     
+    配置文件未修改时不会重新读取，返回的是缓存内容的副本。
+    
     Returns:
         Dict[str, List[str]]: 关键词类型配置字典
     """
-    # 确保配置目录存在
-    if not ensure_config_dir():
-        return DEFAULT_KEYWORD_TYPES.copy()
-    
-    # 如果配置文件不存在，创建默认配置文件
-    if not os.path.exists(KEYWORD_TYPES_FILE):
-        if not save_keyword_types(DEFAULT_KEYWORD_TYPES):
-            return DEFAULT_KEYWORD_TYPES.copy()
+    keyword_types = _read_keyword_types(_config_mtime(KEYWORD_TYPES_FILE))
+    result = {}
+    for name, keywords in keyword_types.items():
+        # 值必须是关键词列表，字符串等其他类型会被list()拆成单个字符，
+        # 这种情况下回退到该类型的默认关键词，没有默认值则忽略该类型
+        if isinstance(keywords, (list, tuple)):
+            result[name] = [keyword for keyword in keywords if isinstance(keyword, str)]
+        elif name in DEFAULT_KEYWORD_TYPES:
+            result[name] = list(DEFAULT_KEYWORD_TYPES[name])
+    return result
+
+
+@functools.lru_cache(maxsize=1)
+def _read_keyword_types(mtime_ns: Optional[int]) -> Mapping[str, Sequence[str]]:
+    """
+    读取关键词类型配置文件，配置文件不存在时创建默认配置
     
-    # 读取配置文件
+    Args:
+        mtime_ns: 配置文件的修改时间，只作为缓存的键，文件被修改后重新读取
+        
+    Returns:
+        Mapping[str, Sequence[str]]: 关键词类型配置，调用方不应修改
+    """
+    # 读取配置文件，文件不存在时创建默认配置文件
     try:
         with open(KEYWORD_TYPES_FILE, 'r', encoding='utf-8') as f:
             keyword_types = json.load(f)
             if isinstance(keyword_types, dict):
                 return keyword_types
             else:
-                return DEFAULT_KEYWORD_TYPES.copy()
+                return DEFAULT_KEYWORD_TYPES
+    except FileNotFoundError:
+        save_keyword_types({name: list(keywords) for name, keywords in DEFAULT_KEYWORD_TYPES.items()})
+        return DEFAULT_KEYWORD_TYPES
     except Exception as e:
-        print(f"读取关键词类型配置失败: {e}")
-        return DEFAULT_KEYWORD_TYPES.copy()
+        logger.debug("读取关键词类型配置失败: %s", e)
+        return DEFAULT_KEYWORD_TYPES
 
 
 def save_keyword_types(keyword_types: Dict[str, List[str]]) -> bool:
@@ -147,11 +204,11 @@ def save_keyword_types(keyword_types: Dict[str, List[str]]) -> bool:
     
     # 保存配置文件
     try:
-        with open(KEYWORD_TYPES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(keyword_types, f, indent=2)
+        _write_json(KEYWORD_TYPES_FILE, keyword_types)
+        _read_keyword_types.cache_clear()
         return True
     except Exception as e:
-        print(f"保存关键词类型配置失败: {e}")
+        logger.debug("保存关键词类型配置失败: %s", e)
         return False
 
 
@@ -159,29 +216,39 @@ def load_separators() -> Dict[str, str]:
     """
     加载分隔符配置
     
+    配置文件未修改时不会重新读取，返回的是缓存内容的副本。
+    
     Returns:
         Dict[str, str]: 分隔符配置字典
     """
-    # 确保配置目录存在
-    if not ensure_config_dir():
-        return DEFAULT_SEPARATORS.copy()
-    
-    # 如果配置文件不存在，创建默认配置文件
-    if not os.path.exists(SEPARATORS_FILE):
-        if not save_separators(DEFAULT_SEPARATORS):
-            return DEFAULT_SEPARATORS.copy()
+    return dict(_read_separators(_config_mtime(SEPARATORS_FILE)))
+
+
+@functools.lru_cache(maxsize=1)
+def _read_separators(mtime_ns: Optional[int]) -> Mapping[str, str]:
+    """
+    读取分隔符配置文件，配置文件不存在时创建默认配置
     
-    # 读取配置文件
+    Args:
+        mtime_ns: 配置文件的修改时间，只作为缓存的键，文件被修改后重新读取
+        
+    Returns:
+        Mapping[str, str]: 分隔符配置，调用方不应修改
+    """
+    # 读取配置文件，文件不存在时创建默认配置文件
     try:
         with open(SEPARATORS_FILE, 'r', encoding='utf-8') as f:
             separators = json.load(f)
             if isinstance(separators, dict):
                 return separators
             else:
-                return DEFAULT_SEPARATORS.copy()
+                return DEFAULT_SEPARATORS
+    except FileNotFoundError:
+        save_separators(dict(DEFAULT_SEPARATORS))
+        return DEFAULT_SEPARATORS
     except Exception as e:
-        print(f"读取分隔符配置失败: {e}")
-        return DEFAULT_SEPARATORS.copy()
+        logger.debug("读取分隔符配置失败: %s", e)
+        return DEFAULT_SEPARATORS
 
 
 def save_separators(separators: Dict[str, str]) -> bool:
@@ -200,9 +267,9 @@ def save_separators(separators: Dict[str, str]) -> bool:
     
     # 保存配置文件
     try:
-        with open(SEPARATORS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(separators, f, indent=2)
+        _write_json(SEPARATORS_FILE, separators)
+        _read_separators.cache_clear()
         return True
     except Exception as e:
-        print(f"保存分隔符配置失败: {e}")
+        logger.debug("保存分隔符配置失败: %s", e)
         return False 
\ No newline at end of file
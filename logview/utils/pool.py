@@ -0,0 +1,26 @@
+"""
+进程池实用工具
+
+并行过滤和插件的批量提取共用一个进程池，避免各自创建子进程。
+"""
+
+import os
+import concurrent.futures
+from typing import Optional
+
+
+# 共用的进程池，首次需要时创建
+_process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """
+    获取共用的进程池，首次调用时创建
+
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: 进程池
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _process_pool